@@ -0,0 +1,89 @@
+import re
+
+# Terms tracked on the dashboard.
+BUZZWORDS = ['aws', 'certified', 'cisco', 'pmp', 'google', 'microsoft', 'oracle', 'ibm', 'scrum', 'python', 'java', 'sql']
+PROG_LANGS = ['python', 'java', 'c++', 'javascript', 'ruby', 'go', 'php', 'c#']
+SOFT_SKILLS = ['communication', 'teamwork', 'problem-solving', 'adaptability', 'leadership', 'creativity']
+
+# Resume Length Distribution (word count bins)
+LENGTH_BINS = [(0, 100), (101, 200), (201, 300), (301, 400), (401, float('inf'))]
+LENGTH_LABELS = ["0-100", "101-200", "201-300", "301-400", "401+"]
+
+def _term_pattern(term):
+    if term in ['c++', 'c#']:
+        return re.compile(r'(?<!\w)' + re.escape(term) + r'(?!\w)', re.IGNORECASE)
+    return re.compile(r'\b' + re.escape(term) + r'\b', re.IGNORECASE)
+
+# Counter key -> compiled pattern, built once at import.
+TERM_PATTERNS = {}
+for _prefix, _terms in (('buzz', BUZZWORDS), ('lang', PROG_LANGS), ('soft', SOFT_SKILLS)):
+    for _term in _terms:
+        TERM_PATTERNS[f"{_prefix}:{_term}"] = _term_pattern(_term)
+
+def resume_stats(text):
+    """
+    Computes one resume's contribution to the dashboard aggregates.
+
+    Returns:
+        dict: counter key -> count, e.g. {"buzz:aws": 2, "lang:c++": 1, "len:201-300": 1}.
+        Only non-zero counts are included.
+    """
+    text = text or ""
+    stats = {}
+    for key, pattern in TERM_PATTERNS.items():
+        count = len(pattern.findall(text))
+        if count:
+            stats[key] = count
+    if text.strip():
+        words = len(text.split())
+        for (low, high), label in zip(LENGTH_BINS, LENGTH_LABELS):
+            if low <= words <= high:
+                stats[f"len:{label}"] = 1
+                break
+    return stats
+
+class DashboardAggregates:
+    """
+    Running dashboard totals kept in the ResumeStore.
+
+    Each resume's term counts and length bin are computed once at ingest and folded
+    into the store's counters; they are subtracted again when the upload is evicted,
+    so rendering the dashboard only reads a few dozen counters.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        store.on_evict(self.discard)
+
+    def add(self, summary_id, text):
+        self.store.record_stats(summary_id, resume_stats(text))
+
+    def discard(self, summary_id):
+        self.store.discard_stats(summary_id)
+
+    def backfill(self, texts):
+        """
+        Computes stats for stored resumes that predate the aggregates.
+        """
+        for summary_id in self.store.keys_without_stats():
+            text = texts.get(summary_id)
+            if text is not None:
+                self.add(summary_id, text)
+
+    def snapshot(self):
+        """
+        Returns the dashboard.html context built from the current totals.
+        """
+        counters = self.store.counters()
+        buzz = sorted(((word, counters.get(f"buzz:{word}", 0)) for word in BUZZWORDS),
+                      key=lambda item: item[1], reverse=True)[:10]
+        return {
+            'buzz_labels': [item[0] for item in buzz],
+            'buzz_data': [item[1] for item in buzz],
+            'prog_langs': PROG_LANGS,
+            'prog_lang_counts': [counters.get(f"lang:{lang}", 0) for lang in PROG_LANGS],
+            'soft_skills': SOFT_SKILLS,
+            'soft_skill_counts': [counters.get(f"soft:{skill}", 0) for skill in SOFT_SKILLS],
+            'length_labels': LENGTH_LABELS,
+            'length_counts': [counters.get(f"len:{label}", 0) for label in LENGTH_LABELS],
+        }
@@ -1,31 +1,48 @@
+import time
+_import_started = time.perf_counter()
+
 import os
-import zipfile
-import tempfile
+import logging
 import uuid
-import base64
+import hashlib
+import io
 import re
-from collections import Counter
-from flask import Flask, render_template, request, flash, url_for, Response
-from transformers import pipeline
-from file_parser import extract_text_from_file
-from nlp_utils import (
-    extract_entities, 
-    perform_basic_validation, 
-    extract_candidate_name, 
-    extract_cleaned_data
-)
+import json
+import shutil
+import tempfile
+from itertools import islice
+from flask import Flask, render_template, request, flash, url_for, Response, jsonify, stream_with_context, send_file, session, g
+from file_parser import iter_zip_resumes, count_zip_resumes, read_limited
+from pipeline import iter_ingest, extraction_pool
+from scoring import compute_score_robust, get_scorer, CRITERIA_KEYS
+from resume_index import InvertedIndex
+from bulk_scoring import BulkScorer
+from semantic import SemanticIndex, SEMANTIC_SCORING, job_query
+from storage import create_store
+from summarization import SummaryWorker, get_summarizer
+from analytics import DashboardAggregates
+from nlp_utils import get_nlp, EMAIL_RE
+from jobs import submit_job, get_job, StoredJob
+import metrics
+from metrics import StageTimer
 
 app = Flask(__name__)
 app.secret_key = 'your_secret_key'  # Replace with your own secure key
 
-# Initialize the summarization pipeline (make sure to install PyTorch)
-summarizer = pipeline("summarization", model="sshleifer/distilbart-cnn-12-6")
-
-# Global dictionaries to store data
-FILE_STORE = {}       # Maps summary_id -> file bytes for PDFs
-RAW_TEXT = {}         # Maps summary_id -> extracted text for resumes
-SUMMARY_DATA = {}     # Maps summary_id -> summarized text
-FILTERED_RESULTS = [] # Stores the filtered candidate results (for email download)
+# Persistent resume store (SQLite + blobs on disk by default, see storage.py) with dict-style views
+STORE = create_store()
+FILE_STORE = STORE.mapping('file')       # Maps summary_id -> file bytes for PDFs
+RAW_TEXT = STORE.mapping('text')         # Maps summary_id -> extracted text for resumes
+SUMMARY_DATA = STORE.mapping('summary')  # Maps summary_id -> summarized text
+RESUME_INDEX = InvertedIndex()  # Positional index over RAW_TEXT for re-scoring without re-parsing
+STORE.on_evict(RESUME_INDEX.remove)
+# Resume vectors for semantic matching, computed at ingest (RESUME_SEMANTIC=yes, see semantic.py)
+SEMANTIC = SemanticIndex(get_nlp) if SEMANTIC_SCORING else None
+if SEMANTIC is not None:
+    STORE.on_evict(SEMANTIC.remove)
+SUMMARY_WORKER = SummaryWorker(SUMMARY_DATA)
+DASHBOARD = DashboardAggregates(STORE)  # Precomputed dashboard totals
+DASHBOARD.backfill(RAW_TEXT)
 
 # ----------------------
 # Helper Functions
@@ -35,125 +52,343 @@ def extract_emails(text):
     """
     Extract email addresses from a text using regex.
     """
-    pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-    return re.findall(pattern, text)
+    return EMAIL_RE.findall(text)
+
+# Results API paging: default and maximum page sizes, and the sortable fields.
+RESULTS_PER_PAGE = 50
+RESULTS_MAX_PER_PAGE = 500
+RESULT_SORT_KEYS = {
+    'score': lambda r: r.get('score', 0),
+    'name': lambda r: (r.get('candidate_name') or r.get('file') or '').lower(),
+    'file': lambda r: (r.get('file') or '').lower(),
+    'extract_seconds': lambda r: r.get('extract_seconds', 0),
+}
 
-def compute_score_robust(resume_text, job_title, required_skills, required_languages, 
-                         min_skills, min_languages, enable_ats, enable_bonus, 
-                         extra_bonus_keywords, extra_universities):
+# Content types for files served by /raw, and how long browsers may cache them.
+RAW_MIMETYPES = {'pdf': 'application/pdf'}
+RAW_MAX_AGE = 3600
+
+def criteria_from_form(form):
     """
-    Computes a robust resume score with a detailed breakdown.
-    
-    Components:
-      1. Skills + Job Requirement Matching (max = 5 points):
-         - Required Skills Matching (max = 4 points; uses min_skills as threshold if provided)
-         - Job Title Matching (max = 1 point)
-      2. Languages Matching (max = 1 point):
-         - If no language requirements are provided, award full points.
-      3. Bonus Keywords (max = 3 points):
-         - If bonus evaluation is not enabled, award full points.
-      4. ATS Compatibility (max = 2 points):
-         - If ATS evaluation is not enabled, award full points.
-         
-    Returns:
-        tuple: (final_score, breakdown)
+    Reads the job scoring criteria from the upload form.
+    The keys match the keyword arguments of compute_score_robust.
     """
-    base_text = str(resume_text).lower() if resume_text else ""
-    
-    # --- Component 1: Skills + Job Requirement Matching (Max = 5) ---
-    required_skills_list = [s.strip().lower() for s in required_skills.split(',') if s.strip()]
-    skills_score = 0
-    if required_skills_list:
-        matched_skills = sum(1 for s in required_skills_list if s in base_text)
-        if min_skills and str(min_skills).isdigit() and int(min_skills) > 0:
-            min_skills_val = int(min_skills)
-            skills_score = 4 if matched_skills >= min_skills_val else (matched_skills / min_skills_val) * 4
-        else:
-            skills_score = (matched_skills / len(required_skills_list)) * 4
-        skills_score = min(skills_score, 4)
-    
-    job_title_score = 0
-    if job_title:
-        job_title_lower = job_title.lower().strip()
-        if job_title_lower in base_text:
-            job_title_score = 1
-        else:
-            words = job_title_lower.split()
-            if words:
-                match = sum(1 for word in words if word in base_text)
-                job_title_score = min(match / len(words), 1)
-    
-    component1_score = skills_score + job_title_score
-
-    # --- Component 2: Languages Matching (Max = 1) ---
-    if required_languages:
-        languages_list = [s.strip().lower() for s in required_languages.split(',') if s.strip()]
-        if languages_list:
-            matched_languages = sum(1 for lang in languages_list if lang in base_text)
-            if min_languages and str(min_languages).isdigit() and int(min_languages) > 0:
-                min_languages_val = int(min_languages)
-                language_score = 1 if matched_languages >= min_languages_val else (matched_languages / min_languages_val)
-            else:
-                language_score = matched_languages / len(languages_list)
+    return {
+        'job_title': form.get('job_title'),
+        'required_skills': form.get('skills'),
+        'required_languages': form.get('languages', ''),
+        'min_skills': form.get('min_skills', ''),
+        'min_languages': form.get('min_languages', ''),
+        'enable_ats': form.get('enable_ats', 'no'),
+        'enable_bonus': form.get('enable_bonus', 'no'),
+        'extra_bonus_keywords': form.get('extra_bonus_keywords', ''),
+        'extra_universities': form.get('extra_universities', ''),
+    }
+
+# Uploaded resumes are read and ingested this many at a time, so a large ZIP never
+# sits decompressed in memory as a whole.
+INGEST_CHUNK_SIZE = int(os.environ.get('RESUME_INGEST_CHUNK_SIZE', 32))
+
+def upload_sources(files):
+    """
+    The uploaded files as (filename, opener) pairs, where opener() returns a binary stream.
+    """
+    return [(file.filename, lambda file=file: file.stream) for file in files if file.filename]
+
+def spool_upload_sources(files, directory):
+    """
+    Saves the uploaded files (ZIPs still compressed) to `directory` so a background
+    job can read them after the request ends. Returns (filename, opener) pairs.
+    """
+    sources = []
+    for index, file in enumerate(files):
+        if not file.filename:
+            continue
+        path = os.path.join(directory, str(index))
+        file.save(path)
+        sources.append((file.filename, lambda path=path: open(path, 'rb')))
+    return sources
+
+def count_upload_items(sources):
+    """
+    Number of items iter_upload_items yields for the sources (ZIP members are
+    counted from the archive's directory).
+    """
+    total = 0
+    for filename, opener in sources:
+        if not filename.lower().endswith('.zip'):
+            total += 1
+            continue
+        try:
+            with opener() as stream:
+                total += count_zip_resumes(stream)
+        except Exception:
+            total += 1
+    return total
+
+def iter_upload_items(sources):
+    """
+    Reads uploaded files, and the resumes inside uploaded ZIPs, one at a time.
+    ZIP members are streamed straight out of the archive, subject to the size and
+    zip-bomb limits in file_parser.
+
+    Yields:
+        dict: {'name', 'data'} items for the ingestion pipeline, or {'name', 'error'}
+        for files that could not be read.
+    """
+    for filename, opener in sources:
+        try:
+            with opener() as stream:
+                if filename.lower().endswith('.zip'):
+                    for name, data, error in iter_zip_resumes(stream):
+                        yield {'name': name, 'error': error} if error else {'name': name, 'data': data}
+                else:
+                    yield {'name': filename, 'data': read_limited(stream)}
+        except Exception as e:
+            yield {'name': filename, 'error': f"Error processing file: {str(e)}"}
+
+def file_type(name):
+    return os.path.splitext(name)[1].lower().lstrip('.') or 'unknown'
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def normalized_text_hash(text):
+    """
+    Hash of the resume's words only (case, punctuation and layout removed), so the
+    same resume exported as PDF, DOCX or TXT hashes identically. None for empty text.
+    """
+    words = re.findall(r'\w+', (text or '').lower())
+    if not words:
+        return None
+    return hashlib.sha256(" ".join(words).encode('utf-8')).hexdigest()
+
+def iter_records(items, timer, chunk_size=None):
+    """
+    Runs items through the ingestion pipeline a chunk at a time (items are consumed
+    lazily), serving files seen before from the content-addressed cache (keyed by
+    the SHA-256 of the file bytes). Cache hits and repeats skip text extraction and
+    all spaCy work. Read time, and extraction and spaCy time per file, are reported
+    to `timer` (a metrics.StageTimer). All chunks share one extraction process pool.
+    """
+    chunk_size = INGEST_CHUNK_SIZE if chunk_size is None else chunk_size
+    items = iter(items)
+    with extraction_pool() as pool:
+        while True:
+            started = time.perf_counter()
+            chunk = list(islice(items, max(chunk_size, 1)))
+            timer.add('read', time.perf_counter() - started)
+            if not chunk:
+                return
+            yield from _iter_chunk_records(chunk, timer, pool)
+
+def _iter_chunk_records(items, timer, pool):
+    misses = []
+    repeats = {}   # content hash -> later items in this batch with the same bytes
+    for item in items:
+        if item.get('error'):
+            yield dict(item, error=item['error'], extract_seconds=0.0)
+            continue
+        metrics.observe('resume_upload_file_bytes', len(item['data']), file_type=file_type(item['name']))
+        with timer.stage('hash'):
+            item['content_hash'] = content_hash(item['data'])
+            cached = STORE.get_content(item['content_hash'])
+        metrics.cache_lookup('content', cached is not None or item['content_hash'] in repeats)
+        if cached is not None:
+            yield dict(item, text=cached['text'], analysis=cached['analysis'], emails=cached['emails'],
+                       error=None, extract_seconds=0.0, cached=True)
+        elif item['content_hash'] in repeats:
+            repeats[item['content_hash']].append(item)
         else:
-            language_score = 1
-    else:
-        language_score = 1
-
-    # --- Component 3: Bonus Keywords (Max = 3) ---
-    if str(enable_bonus).strip().lower() == "yes":
-        bonus_score = 0.0
-        bonus_keywords = {
-            'aws certified': 1.0,
-            'cisco certified': 1.0,
-            'pmp': 1.0,
-            'google': 0.5,
-            'microsoft': 0.5,
-            'oracle': 0.5,
-            'ibm': 0.5,
-            'certified': 0.3,
-            'scrum': 0.3,
-        }
-        if extra_bonus_keywords:
-            for kw in extra_bonus_keywords.split(','):
-                kw = kw.strip().lower()
-                if kw:
-                    bonus_keywords[kw] = 0.5
-        if extra_universities:
-            for uni in extra_universities.split(','):
-                uni = uni.strip().lower()
-                if uni:
-                    bonus_keywords[uni] = 0.5
-        for keyword, points in bonus_keywords.items():
-            if re.search(r'\b' + re.escape(keyword) + r'\b', base_text):
-                bonus_score += points
-        bonus_score = min(bonus_score, 2)
-    else:
-        bonus_score = 2
+            repeats[item['content_hash']] = []
+            misses.append(item)
+    for record in iter_ingest(misses, pool=pool):
+        timer.add('extract', record['extract_seconds'])
+        timer.add('nlp', record['nlp_seconds'])
+        if not record['error']:
+            # The analysis already scanned the text for contacts.
+            record['emails'] = record['analysis']['validation']['emails']
+            STORE.put_content(record['content_hash'], {
+                'text': record['text'],
+                'analysis': record['analysis'],
+                'emails': record['emails'],
+            })
+        yield record
+        for repeat in repeats.get(record['content_hash'], []):
+            yield dict(record, name=repeat['name'], data=repeat['data'], extract_seconds=0.0,
+                       cached=not record['error'])
 
-    # --- Component 4: ATS Compatibility (Max = 2) ---
-    if str(enable_ats).strip().lower() == "yes":
-        ats_keywords = ["experience", "education", "skills", "certification", "projects", "summary", "objective", "profile"]
-        ats_count = sum(1 for word in ats_keywords if word in base_text)
-        ats_score = min((ats_count / len(ats_keywords)) * 2, 2)
+def build_result(record, criteria, timer):
+    """
+    Scores one ingested resume, stores its text (and PDF bytes) for the
+    summary/full views, and returns the result entry rendered by result.html.
+    The entry is compact and JSON-serializable: the resume text stays in the store
+    under summary_id.
+    """
+    outcome = 'error' if record['error'] else 'cached' if record.get('cached') else 'processed'
+    metrics.inc('resume_files_total', file_type=file_type(record['name']), outcome=outcome)
+    timer.count(f"files_{outcome}")
+    if outcome == 'processed':
+        tier = record['analysis'].get('name_tier')
+        metrics.inc('resume_name_tier_total', tier=tier)
+        timer.count(f"name_{tier}")
+    if record['error']:
+        return {'file': record['name'], 'error': record['error'],
+                'extract_seconds': round(record['extract_seconds'], 3)}
+    extracted_text = record['text']
+    analysis = record['analysis']
+    # Extract emails from the resume text (cached records already carry them).
+    emails = record.get('emails')
+    if emails is None:
+        emails = extract_emails(extracted_text)
+    summary_id = str(uuid.uuid4())
+    if SEMANTIC is not None:
+        with timer.stage('embed'):
+            SEMANTIC.add(summary_id, extracted_text)
+        with timer.stage('score'):
+            semantic = SEMANTIC.points(job_query(criteria), [summary_id]).get(summary_id)
+            score, breakdown = get_scorer(*(criteria[key] for key in CRITERIA_KEYS)).score(extracted_text, semantic)
     else:
-        ats_score = 2
-
-    raw_total = component1_score + language_score + bonus_score + ats_score
-    total_max = 10
-    final_score = (raw_total / total_max) * 10 if total_max > 0 else 0
-
-    breakdown = {
-        "required_skills": round(skills_score, 2),
-        "job_title": round(job_title_score, 2),
-        "skills_job": round(component1_score, 2),
-        "languages": round(language_score, 2),
-        "bonus": round(bonus_score, 2),
-        "ats": round(ats_score, 2),
-        "raw_total": round(raw_total, 2),
-        "total_max": total_max
+        with timer.stage('score'):
+            score, breakdown = compute_score_robust(extracted_text, **criteria)
+    store_started = time.perf_counter()
+    if os.path.splitext(record['name'])[1].lower() == '.pdf':
+        file_bytes = record.get('data')
+        if file_bytes is None:
+            with open(record['path'], 'rb') as f:
+                file_bytes = f.read()
+        FILE_STORE[summary_id] = {'type': 'pdf', 'data': file_bytes}
+    RAW_TEXT[summary_id] = extracted_text
+    RESUME_INDEX.add(summary_id, extracted_text)
+    DASHBOARD.add(summary_id, extracted_text)
+    # Near-duplicate detection: the first upload with the same normalized text wins.
+    text_hash = normalized_text_hash(extracted_text)
+    first = None
+    if text_hash:
+        first = STORE.claim_text_hash(text_hash, {'summary_id': summary_id, 'file': record['name']})
+    timer.add('store', time.perf_counter() - store_started)
+    return {
+        'file': record['name'],
+        'candidate_name': analysis['candidate_name'],
+        'name_tier': analysis.get('name_tier'),
+        'emails': emails,
+        'validation': analysis['validation'],
+        'score': score,
+        'score_breakdown': breakdown,
+        'summary_id': summary_id,
+        'extract_seconds': round(record['extract_seconds'], 3),
+        'cached': bool(record.get('cached')),
+        'duplicate_of': first if first and first['summary_id'] != summary_id else None
     }
-    return round(final_score, 2), breakdown
+
+def ensure_indexed(summary_ids):
+    """
+    Indexes resumes stored by another worker or before a restart on first use.
+    """
+    for sid in summary_ids:
+        if sid and sid not in RESUME_INDEX and sid in RAW_TEXT:
+            RESUME_INDEX.add(sid, RAW_TEXT[sid])
+        if SEMANTIC is not None and sid and sid not in SEMANTIC and sid in RAW_TEXT:
+            SEMANTIC.add(sid, RAW_TEXT[sid])
+
+def rank_results(results):
+    return sorted(results, key=lambda x: x.get('score', 0), reverse=True)
+
+def save_results(job_id, results, criteria):
+    """
+    Persists a batch's ranked results under its job id (shared by all workers)
+    and remembers it as this session's latest batch.
+    """
+    STORE.put_results(job_id, {'criteria': criteria, 'results': results})
+    session['last_job_id'] = job_id
+
+def find_job(job_id):
+    """
+    Looks up a batch by job id: a running or recent job in this process first,
+    then the persisted snapshot (a job running in another worker, or a saved batch).
+    """
+    job = get_job(job_id)
+    if job is not None:
+        return job
+    payload = STORE.get_results(job_id)
+    if payload is None:
+        return None
+    return StoredJob(job_id, payload, STORE.get_results)
+
+def load_results(job_id):
+    """
+    Returns:
+        tuple: (ranked results, criteria, Job) for a batch, or None for an unknown id.
+    """
+    job = find_job(job_id)
+    if job is None:
+        return None
+    return job.ranked_results(), job.criteria, job
+
+def page_results(results, sort='score', order='desc', min_score=None, top=None, page=1, per_page=RESULTS_PER_PAGE, emails=False):
+    """
+    Filters, sorts and paginates an already ranked list of results.
+
+    min_score and top (the best N by score) select candidates the way the results page
+    filters do; sort/order then arrange the selection and `page` picks one slice of it.
+    Each returned result carries its `rank` by score within the whole batch.
+    With emails=True the unique emails of the whole selection are included.
+    """
+    ranked = [dict(r, rank=i) for i, r in enumerate(results, start=1)]
+    if min_score is not None:
+        ranked = [r for r in ranked if r.get('score', 0) >= min_score]
+    if top and top > 0:
+        ranked = ranked[:top]
+    if sort != 'score' or order != 'desc':
+        ranked.sort(key=RESULT_SORT_KEYS[sort], reverse=order == 'desc')
+    per_page = max(1, min(per_page, RESULTS_MAX_PER_PAGE))
+    pages = max(1, -(-len(ranked) // per_page))
+    page = max(1, min(page, pages))
+    payload = {
+        'total': len(results),
+        'matched': len(ranked),
+        'page': page,
+        'per_page': per_page,
+        'pages': pages,
+        'results': ranked[(page - 1) * per_page:page * per_page],
+    }
+    if emails:
+        payload['emails'] = list(dict.fromkeys(e for r in ranked for e in r.get('emails', []) if e))
+    return payload
+
+def render_results(results, criteria, job_id, job=None):
+    """
+    Renders result.html for an already ranked list of results. Only the batch
+    statistics are rendered; the page loads the candidate cards from the JSON
+    results API (see job_results) one page at a time.
+    """
+    total_candidates = len(results)
+    average_score = round(sum(r.get('score', 0) for r in results) / total_candidates, 2) if total_candidates > 0 else 0
+    highest_score = max(r.get('score', 0) for r in results) if total_candidates > 0 else 0
+    lowest_score = min(r.get('score', 0) for r in results) if total_candidates > 0 else 0
+
+    return render_template('result.html', job_title=criteria['job_title'],
+                           required_skills=criteria['required_skills'],
+                           required_languages=criteria['required_languages'], total_candidates=total_candidates,
+                           average_score=average_score, highest_score=highest_score, lowest_score=lowest_score,
+                           criteria=criteria, job_id=job_id, job=job)
+
+# ----------------------
+# Instrumentation
+# ----------------------
+
+@app.before_request
+def start_timer():
+    g.timer = StageTimer(request.endpoint or 'unknown')
+
+@app.after_request
+def record_request(response):
+    timer = g.get('timer')
+    if timer is not None:
+        metrics.inc('resume_requests_total', endpoint=timer.endpoint, status=response.status_code)
+        metrics.observe('resume_request_seconds', time.perf_counter() - timer.started, endpoint=timer.endpoint)
+        timer.log_record(method=request.method, status=response.status_code)
+    return response
 
 # ----------------------
 # Routes
@@ -174,149 +409,283 @@ def upload():
         flash("No files uploaded.")
         return render_template('index.html')
     
-    # Retrieve form data
-    job_title = request.form.get('job_title')
-    required_skills = request.form.get('skills')
-    required_languages = request.form.get('languages', '')
-    min_skills = request.form.get('min_skills', '')
-    min_languages = request.form.get('min_languages', '')
-    enable_ats = request.form.get('enable_ats', 'no')
-    enable_bonus = request.form.get('enable_bonus', 'no')
-    extra_bonus_keywords = request.form.get('extra_bonus_keywords', '')
-    extra_universities = request.form.get('extra_universities', '')
+    criteria = criteria_from_form(request.form)
     
+    if str(request.form.get('async', request.args.get('async', 'no'))).strip().lower() in ('yes', '1', 'true'):
+        # Async mode: spool the uploads to disk, hand them to a background job and
+        # return immediately. The job reads them (and ZIP members) a chunk at a time.
+        with g.timer.stage('read'):
+            spool = tempfile.mkdtemp(prefix='resume-upload-')
+            sources = spool_upload_sources(files, spool)
+            total = count_upload_items(sources)
+
+        def work(job):
+            timer = StageTimer('upload_job')
+            try:
+                for record in iter_records(iter_upload_items(sources), timer):
+                    job.add_result(build_result(record, job.criteria, timer))
+            finally:
+                shutil.rmtree(spool, ignore_errors=True)
+            SUMMARY_WORKER.presummarize(job.ranked_results(), RAW_TEXT)
+            timer.log_record(job_id=job.id, files=job.total)
+
+        # Progress and partial results are persisted as they arrive, so every worker can serve them.
+        job = submit_job(total, criteria, work, persist=STORE.put_results)
+        session['last_job_id'] = job.id
+        return jsonify({
+            'job_id': job.id,
+            'status_url': url_for('job_status', job_id=job.id),
+            'stream_url': url_for('job_stream', job_id=job.id),
+            'results_url': url_for('job_results', job_id=job.id)
+        }), 202
+    
+    timer = g.timer
     results = []
-    for file in files:
-        if not file.filename:
-            continue
-        filename = file.filename.lower()
-        try:
-            if filename.endswith('.zip'):
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as tmp_zip:
-                    file.save(tmp_zip.name)
-                with zipfile.ZipFile(tmp_zip.name, 'r') as zip_ref:
-                    for name in zip_ref.namelist():
-                        if name.endswith(('.pdf', '.docx', '.txt')):
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(name)[1]) as tmp_file:
-                                file_bytes = zip_ref.read(name)
-                                tmp_file.write(file_bytes)
-                                tmp_file.close()
-                                extracted_text = extract_text_from_file(tmp_file.name)
-                                entities = extract_entities(extracted_text)
-                                validation = perform_basic_validation(extracted_text)
-                                candidate_name = extract_candidate_name(extracted_text)
-                                # Extract emails from the resume text.
-                                emails = extract_emails(extracted_text)
-                                score, breakdown = compute_score_robust(
-                                    extracted_text,
-                                    job_title,
-                                    required_skills,
-                                    required_languages,
-                                    min_skills,
-                                    min_languages,
-                                    enable_ats,
-                                    enable_bonus,
-                                    extra_bonus_keywords,
-                                    extra_universities
-                                )
-                                summary_id = str(uuid.uuid4())
-                                ext_lower = os.path.splitext(name)[1].lower()
-                                if ext_lower == '.pdf':
-                                    FILE_STORE[summary_id] = {'type': 'pdf', 'data': file_bytes}
-                                    RAW_TEXT[summary_id] = extracted_text
-                                else:
-                                    RAW_TEXT[summary_id] = extracted_text
-                                results.append({
-                                    'file': name,
-                                    'text': extracted_text,
-                                    'candidate_name': candidate_name,
-                                    'emails': emails,
-                                    'entities': entities,
-                                    'validation': validation,
-                                    'score': score,
-                                    'score_breakdown': breakdown,
-                                    'summary_id': summary_id
-                                })
-                            os.remove(tmp_file.name)
-                os.remove(tmp_zip.name)
-            else:
-                ext = os.path.splitext(file.filename)[1]
-                with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp_file:
-                    file.save(tmp_file.name)
-                extracted_text = extract_text_from_file(tmp_file.name)
-                entities = extract_entities(extracted_text)
-                validation = perform_basic_validation(extracted_text)
-                candidate_name = extract_candidate_name(extracted_text)
-                # Extract emails from the resume text.
-                emails = extract_emails(extracted_text)
-                score, breakdown = compute_score_robust(
-                    extracted_text,
-                    job_title,
-                    required_skills,
-                    required_languages,
-                    min_skills,
-                    min_languages,
-                    enable_ats,
-                    enable_bonus,
-                    extra_bonus_keywords,
-                    extra_universities
-                )
-                summary_id = str(uuid.uuid4())
-                if ext.lower() == '.pdf':
-                    with open(tmp_file.name, 'rb') as f:
-                        file_bytes = f.read()
-                    FILE_STORE[summary_id] = {'type': 'pdf', 'data': file_bytes}
-                    RAW_TEXT[summary_id] = extracted_text
-                else:
-                    RAW_TEXT[summary_id] = extracted_text
-                results.append({
-                    'file': file.filename,
-                    'text': extracted_text,
-                    'candidate_name': candidate_name,
-                    'emails': emails,
-                    'entities': entities,
-                    'validation': validation,
-                    'score': score,
-                    'score_breakdown': breakdown,
-                    'summary_id': summary_id
-                })
-                os.remove(tmp_file.name)
-        except Exception as e:
-            results.append({'file': file.filename, 'text': f"Error processing file: {str(e)}"})
+    # Read a chunk, extract in a process pool, parse with nlp.pipe, then score each resume.
+    for record in iter_records(iter_upload_items(upload_sources(files)), timer):
+        results.append(build_result(record, criteria, timer))
     
-    results = sorted(results, key=lambda x: x.get('score', 0), reverse=True)
+    results = rank_results(results)
     
-    # Store the filtered results globally for email download.
-    global FILTERED_RESULTS
-    FILTERED_RESULTS = results
+    # Store the results under this upload's job id (for email download and re-scoring).
+    job_id = str(uuid.uuid4())
+    with timer.stage('save'):
+        save_results(job_id, results, criteria)
+    # Optionally warm the summaries of the top candidates in the background.
+    SUMMARY_WORKER.presummarize(results, RAW_TEXT)
 
-    total_candidates = len(results)
-    average_score = round(sum(r.get('score', 0) for r in results) / total_candidates, 2) if total_candidates > 0 else 0
-    highest_score = max(r.get('score', 0) for r in results) if total_candidates > 0 else 0
-    lowest_score = min(r.get('score', 0) for r in results) if total_candidates > 0 else 0
+    with timer.stage('render'):
+        return render_results(results, criteria, job_id)
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """
+    Reports job progress. Results completed after index `since` (completion order)
+    are returned as `new_results`; `results` holds the ranked results so far.
+    """
+    since = request.args.get('since', 0, type=int)
+    job = find_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    status = job.progress()
+    status['new_results'] = job.results[since:]
+    status['results'] = job.ranked_results()
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    """
+    Streams results as newline-delimited JSON while the job runs,
+    followed by a final line with the ranked results. Jobs running in another
+    worker are followed through their persisted snapshots.
+    """
+    job = find_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+
+    def generate():
+        sent = 0
+        while True:
+            new_results, done = job.wait_for_results(sent, timeout=15)
+            for result in new_results:
+                line = job.progress()
+                line['result'] = result
+                yield json.dumps(line) + "\n"
+            sent += len(new_results)
+            if done and sent >= job.processed:
+                break
+        final = job.progress()
+        final['results'] = job.ranked_results()
+        yield json.dumps(final) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
-    return render_template('result.html', results=results, job_title=job_title, required_skills=required_skills,
-                           required_languages=required_languages, total_candidates=total_candidates,
-                           average_score=average_score, highest_score=highest_score, lowest_score=lowest_score)
+@app.route('/jobs/<job_id>/results')
+def job_results(job_id):
+    """
+    Renders result.html from the job's results (partial while the job is still running).
+
+    With ?format=json, returns one page of results instead. Query parameters:
+    sort (score, name, file, extract_seconds), order (asc/desc), min_score, top,
+    page, per_page, and emails=yes for the selection's unique emails.
+    """
+    loaded = load_results(job_id)
+    if loaded is None:
+        if request.args.get('format') == 'json':
+            return jsonify({'error': 'Unknown job id'}), 404
+        return "Unknown job id", 404
+    results, criteria, job = loaded
+    if request.args.get('format') != 'json':
+        return render_results(results, criteria, job_id, job=job)
+
+    sort = request.args.get('sort', 'score')
+    order = request.args.get('order', 'desc' if sort in ('score', 'extract_seconds') else 'asc')
+    if sort not in RESULT_SORT_KEYS or order not in ('asc', 'desc'):
+        return jsonify({'error': 'Unknown sort field or order'}), 400
+    payload = page_results(results, sort=sort, order=order,
+                           min_score=request.args.get('min_score', type=float),
+                           top=request.args.get('top', type=int),
+                           page=request.args.get('page', 1, type=int),
+                           per_page=request.args.get('per_page', RESULTS_PER_PAGE, type=int),
+                           emails=request.args.get('emails') == 'yes')
+    payload['job_id'] = job_id
+    payload['status'] = job.status if job is not None else 'finished'
+    return jsonify(payload)
+
+@app.route('/rescore', methods=['POST'])
+def rescore():
+    """
+    Re-ranks already uploaded resumes against new criteria using RESUME_INDEX only
+    (no file access, no spaCy). The batch is selected by job_id, by a comma-separated
+    list of summary ids, or defaults to this session's latest batch. The new ranking
+    is saved as a batch of its own.
+    """
+    criteria = criteria_from_form(request.form)
+    job_id = request.form.get('job_id') or request.args.get('job_id') or session.get('last_job_id')
+    ids = request.form.get('ids') or request.args.get('ids')
+    loaded = load_results(job_id) if job_id else None
+    if loaded is None:
+        return "Unknown job id", 404
+    previous = loaded[0]
+    if ids:
+        wanted = set(i.strip() for i in ids.split(',') if i.strip())
+        previous = [r for r in previous if r.get('summary_id') in wanted]
+
+    scorer = get_scorer(*(criteria[key] for key in CRITERIA_KEYS))
+    ids = [r['summary_id'] for r in previous if r.get('summary_id')]
+    ensure_indexed(ids)
+    semantic = SEMANTIC.points(job_query(criteria), ids) if SEMANTIC is not None else None
+    scores = RESUME_INDEX.score(scorer, ids, semantic)
+    results = []
+    for result in previous:
+        if result.get('summary_id') in scores:
+            score, breakdown = scores[result['summary_id']]
+            result = dict(result, score=score, score_breakdown=breakdown)
+        results.append(result)
+    results = rank_results(results)
+    new_job_id = str(uuid.uuid4())
+    save_results(new_job_id, results, criteria)
+    if request.args.get('format') == 'json' or request.form.get('format') == 'json':
+        return jsonify({'job_id': new_job_id, 'results': results})
+    return render_results(results, criteria, new_job_id)
+
+@app.route('/bulk_score', methods=['POST'])
+def bulk_score():
+    """
+    Scores one uploaded batch against several job profiles in a single pass.
+
+    JSON body: {"profiles": [{"name", "job_title", "skills", "languages", ...}, ...],
+    "job_id" (defaults to this session's latest batch), "ids" (optional summary id
+    subset), "top" (optional ranking length)}. Profile fields are the upload form fields.
+    Returns each profile's ranking and the candidates x jobs score table.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        payload = {}
+    profiles = payload.get('profiles') or []
+    if not isinstance(profiles, list) or not profiles:
+        return jsonify({'error': 'At least one job profile is required'}), 400
+    if not all(isinstance(profile, dict) and all(value is None or isinstance(value, str) for value in profile.values())
+               for profile in profiles):
+        return jsonify({'error': 'Each job profile must be an object of text fields'}), 400
+    if payload.get('ids') is not None and not (isinstance(payload['ids'], list)
+                                               and all(isinstance(i, str) for i in payload['ids'])):
+        return jsonify({'error': 'ids must be a list of summary ids'}), 400
+    job_id = payload.get('job_id') or session.get('last_job_id')
+    loaded = load_results(job_id) if job_id else None
+    if loaded is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    candidates = [r for r in loaded[0] if r.get('summary_id')]
+    if payload.get('ids'):
+        wanted = set(payload['ids'])
+        candidates = [r for r in candidates if r['summary_id'] in wanted]
+    top = payload.get('top')
+
+    timer = g.timer
+    with timer.stage('match'):
+        bulk = BulkScorer.from_criteria([criteria_from_form(profile) for profile in profiles])
+        ids = [r['summary_id'] for r in candidates]
+        ensure_indexed(ids)
+        found = RESUME_INDEX.match(bulk, ids)
+        candidates = [r for r in candidates if r['summary_id'] in found]
+    with timer.stage('score'):
+        table = bulk.score([found[r['summary_id']] for r in candidates])
+
+    jobs = []
+    for j, profile in enumerate(profiles):
+        ranking = []
+        for row, score, breakdown in table.ranked(j, top=top if isinstance(top, int) and top > 0 else None):
+            candidate = candidates[row]
+            ranking.append({'summary_id': candidate['summary_id'], 'file': candidate['file'],
+                            'candidate_name': candidate.get('candidate_name'),
+                            'score': score, 'score_breakdown': breakdown})
+        jobs.append({'name': profile.get('name') or profile.get('job_title') or f"job {j + 1}",
+                     'ranking': ranking})
+    return jsonify({
+        'job_id': job_id,
+        'candidates': [{'summary_id': r['summary_id'], 'file': r['file'],
+                        'candidate_name': r.get('candidate_name')} for r in candidates],
+        'jobs': jobs,
+        'scores': [[round(float(value), 2) for value in row] for row in table.scores],
+    })
+
+@app.route('/semantic_search')
+def semantic_search():
+    """
+    Ranks resumes by cosine similarity to a job description (`q`) using the vectors
+    computed at ingest. With `job_id` only that batch is ranked, otherwise the whole
+    pool held by this worker. `k` limits the ranking (default 20).
+    Requires RESUME_SEMANTIC=yes and a spaCy model with word vectors.
+    """
+    if SEMANTIC is None:
+        return jsonify({'error': 'Semantic matching is disabled (set RESUME_SEMANTIC=yes)'}), 404
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({'error': 'A job description (q) is required'}), 400
+    k = max(request.args.get('k', 20, type=int), 1)
+    job_id = request.args.get('job_id')
+    with g.timer.stage('search'):
+        if job_id:
+            loaded = load_results(job_id)
+            if loaded is None:
+                return jsonify({'error': 'Unknown job id'}), 404
+            candidates = {r['summary_id']: r for r in loaded[0] if r.get('summary_id')}
+            ensure_indexed(candidates)
+            sims = SEMANTIC.similarities(query, candidates)
+            ranked = sorted(sims.items(), key=lambda item: item[1], reverse=True)[:k]
+        else:
+            candidates = {}
+            ranked = SEMANTIC.search(query, k)
+    return jsonify({
+        'query': query,
+        'job_id': job_id,
+        'results': [{'summary_id': sid, 'similarity': round(sim, 4),
+                     'file': candidates.get(sid, {}).get('file'),
+                     'candidate_name': candidates.get(sid, {}).get('candidate_name')}
+                    for sid, sim in ranked],
+    })
 
 @app.route('/summary')
 def summary():
     sid = request.args.get('id')
     if sid:
-        if sid in SUMMARY_DATA:
-            summary_text = SUMMARY_DATA[sid]
-        else:
+        timer = g.timer
+        with timer.stage('lookup'):
+            summary_text = SUMMARY_DATA.get(sid)
+        metrics.cache_lookup('summary', summary_text is not None)
+        if summary_text is None:
             raw_text = RAW_TEXT.get(sid, None)
             if raw_text:
                 try:
-                    summary = summarizer(raw_text, max_length=250, min_length=50, do_sample=False)
-                    summary_text = summary[0]['summary_text']
-                    SUMMARY_DATA[sid] = summary_text
+                    # Queued on the batching worker, which also persists the result to SUMMARY_DATA.
+                    with timer.stage('summarize'):
+                        summary_text = SUMMARY_WORKER.summarize(sid, raw_text)
                 except Exception as e:
                     summary_text = "Summary not available."
             else:
                 summary_text = "No text available for summarization."
-        return render_template('summary.html', data=summary_text)
+        with timer.stage('render'):
+            return render_template('summary.html', data=summary_text)
     else:
         return "No summary ID provided", 404
 
@@ -324,11 +693,10 @@ def summary():
 def full():
     sid = request.args.get('id')
     if sid:
-        file_entry = FILE_STORE.get(sid)
+        file_entry = STORE.file_info(sid)
         if file_entry and file_entry['type'] == 'pdf':
-            pdf_data = file_entry['data']
-            b64_pdf = base64.b64encode(pdf_data).decode('utf-8')
-            return render_template('full.html', data=b64_pdf, is_pdf=True)
+            # The browser loads the PDF itself from /raw (cacheable, range requests).
+            return render_template('full.html', data=url_for('raw', id=sid), is_pdf=True)
         else:
             raw_text = RAW_TEXT.get(sid, None)
             if raw_text:
@@ -338,81 +706,92 @@ def full():
     else:
         return "No resume ID provided", 404
 
+@app.route('/raw')
+def raw():
+    """
+    Streams the original uploaded file with its Content-Type. Stored files never
+    change for a summary_id, so the id doubles as the ETag; conditional GETs and
+    HTTP Range requests are answered by send_file.
+    """
+    sid = request.args.get('id')
+    if not sid:
+        return "No resume ID provided", 404
+    file_entry = STORE.file_info(sid)
+    if not file_entry:
+        return "No stored file available.", 404
+    mimetype = RAW_MIMETYPES.get(file_entry['type'], 'application/octet-stream')
+    source = file_entry['path'] or io.BytesIO(file_entry['data'])
+    response = send_file(source, mimetype=mimetype, etag=sid, conditional=True,
+                         max_age=RAW_MAX_AGE, download_name=f"{sid}.{file_entry['type']}")
+    response.cache_control.private = True
+    response.cache_control.public = False
+    return response
+
 @app.route('/download_emails')
 def download_emails():
     """
-    Aggregates email addresses from the filtered results,
-    removes duplicates, and returns them as a CSV download.
+    Streams the unique email addresses of one batch as a CSV download.
+    The batch is given by ?job_id=, defaulting to this session's latest upload.
     """
-    emails = []
-    for candidate in FILTERED_RESULTS:
-        emails.extend(candidate.get('emails', []))
-    # Remove duplicates and any empty entries.
-    emails = list(set(email for email in emails if email))
-    csv_content = "Email\n" + "\n".join(emails)
+    job_id = request.args.get('job_id') or session.get('last_job_id')
+    loaded = load_results(job_id) if job_id else None
+    if loaded is None:
+        return "Unknown job id", 404
+    results = loaded[0]
+
+    def generate():
+        yield "Email\n"
+        seen = set()
+        for candidate in results:
+            for email in candidate.get('emails', []):
+                # Remove duplicates and any empty entries.
+                if email and email not in seen:
+                    seen.add(email)
+                    yield email + "\n"
+
     return Response(
-        csv_content,
+        stream_with_context(generate()),
         mimetype="text/csv",
         headers={"Content-Disposition": "attachment; filename=emails.csv"}
     )
 
 @app.route('/dashboard')
 def dashboard():
-    # Aggregate all resume texts.
-    all_text = " ".join(RAW_TEXT.values())
-    
-    # Buzzwords frequency
-    buzzwords = ['aws', 'certified', 'cisco', 'pmp', 'google', 'microsoft', 'oracle', 'ibm', 'scrum', 'python', 'java', 'sql']
-    buzzword_counter = Counter()
-    for word in buzzwords:
-        matches = re.findall(r'\b' + re.escape(word) + r'\b', all_text, re.IGNORECASE)
-        buzzword_counter[word] = len(matches)
-    
-    # Programming languages (predefined list)
-    prog_langs = ['python', 'java', 'c++', 'javascript', 'ruby', 'go', 'php', 'c#']
-    prog_lang_counter = Counter()
-    for lang in prog_langs:
-        if lang in ['c++', 'c#']:
-            pattern = r'(?<!\w)' + re.escape(lang) + r'(?!\w)'
-        else:
-            pattern = r'\b' + re.escape(lang) + r'\b'
-        matches = re.findall(pattern, all_text, re.IGNORECASE)
-        prog_lang_counter[lang] = len(matches)
-    
-    # Soft skills (predefined list)
-    soft_skills = ['communication', 'teamwork', 'problem-solving', 'adaptability', 'leadership', 'creativity']
-    soft_skill_counter = Counter()
-    for skill in soft_skills:
-        matches = re.findall(r'\b' + re.escape(skill) + r'\b', all_text, re.IGNORECASE)
-        soft_skill_counter[skill] = len(matches)
-    
-    # Resume Length Distribution (word count bins)
-    resume_lengths = [len(text.split()) for text in RAW_TEXT.values() if text.strip()]
-    bin_ranges = [(0, 100), (101, 200), (201, 300), (301, 400), (401, float('inf'))]
-    length_labels = ["0-100", "101-200", "201-300", "301-400", "401+"]
-    length_counts = [0] * len(bin_ranges)
-    for count in resume_lengths:
-        for i, (low, high) in enumerate(bin_ranges):
-            if low <= count <= high:
-                length_counts[i] += 1
-                break
+    # Served from running totals maintained at ingest (see analytics.DashboardAggregates).
+    with g.timer.stage('aggregate'):
+        context = DASHBOARD.snapshot()
+    with g.timer.stage('render'):
+        return render_template('dashboard.html', **context)
 
-    top_buzzwords = buzzword_counter.most_common(10)
-    prog_lang_counts = [prog_lang_counter[lang] for lang in prog_langs]
-    soft_skill_counts = [soft_skill_counter[skill] for skill in soft_skills]
-    
-    buzz_labels = [item[0] for item in top_buzzwords]
-    buzz_data = [item[1] for item in top_buzzwords]
-    
-    return render_template('dashboard.html', 
-                           buzz_labels=buzz_labels, buzz_data=buzz_data,
-                           prog_langs=prog_langs, prog_lang_counts=prog_lang_counts,
-                           soft_skills=soft_skills, soft_skill_counts=soft_skill_counts,
-                           length_labels=length_labels, length_counts=length_counts)
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Prometheus text exposition of this process's request, stage and cache metrics.
+    """
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def warm_up(models=None):
+    """
+    Loads the models ahead of the first request. Call it (or set RESUME_WARMUP)
+    in the master process before forking, e.g. with gunicorn --preload, so workers
+    share the loaded weights copy-on-write.
+
+    Args:
+        models (str): "nlp", "summarizer" or "all" (comma-separated values allowed).
+    """
+    models = models if models is not None else os.environ.get('RESUME_WARMUP', '')
+    selected = {m.strip().lower() for m in models.split(',') if m.strip()}
+    if selected & {'nlp', 'all'}:
+        get_nlp()
+    if selected & {'summarizer', 'all'}:
+        get_summarizer()
+
+warm_up()
+
+# Time from the start of this module's import until the app is ready to serve.
+STARTUP_SECONDS = time.perf_counter() - _import_started
+app.config['STARTUP_SECONDS'] = STARTUP_SECONDS
+logging.getLogger(__name__).info("Application started in %.2fs", STARTUP_SECONDS)
 
 if __name__ == '__main__':
-    FILE_STORE = {}
-    RAW_TEXT = {}
-    SUMMARY_DATA = {}
-    FILTERED_RESULTS = []
     app.run(debug=True)
@@ -0,0 +1,400 @@
+"""
+Benchmark harness for the ingest-and-score pipeline.
+
+Runs every stage a resume goes through (text extraction, spaCy parse, entity
+extraction, validation, candidate name, scoring) over the Resumes/ corpus and/or a
+synthetic corpus, and reports per-stage latency percentiles, resumes/second and
+peak memory. Results can be written to JSON and compared against an earlier run:
+
+    python benchmark.py --small --synthetic 2000 --json before.json
+    python benchmark.py --small --synthetic 2000 --compare before.json
+
+The comparison also reports how often the extracted candidate names and
+organizations agree with the baseline, e.g. to check the NER-only mode:
+
+    python benchmark.py --json full.json
+    python benchmark.py --nlp-mode ner --ner-prefix 1000 --compare full.json
+
+--docx also times the DOCX extractors (python-docx vs the streaming XML parser)
+on the corpus's DOCX files and reports how much text each recovers:
+
+    python benchmark.py --synthetic 500 --docx
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import subprocess
+import tracemalloc
+from collections import Counter
+
+import nlp_utils
+from file_parser import extract_text_from_file, extract_text_from_docx, is_extraction_error, SUPPORTED_EXTENSIONS
+from nlp_utils import extract_entities, perform_basic_validation, extract_candidate_name, ner_text, analyze_resume
+from scoring import compute_score_robust
+
+DOCX_MODES = ('python-docx', 'stream')
+STAGES = ['extract', 'parse', 'entities', 'validation', 'name', 'tiered', 'score']
+PERCENTILES = (50, 90, 99)
+
+DEFAULT_CRITERIA = {
+    'job_title': 'Project Manager',
+    'required_skills': 'project management, budgeting, sql, python, leadership',
+    'required_languages': 'English',
+    'min_skills': '2',
+    'min_languages': '',
+    'enable_ats': 'yes',
+    'enable_bonus': 'yes',
+    'extra_bonus_keywords': '',
+    'extra_universities': '',
+}
+
+# Vocabulary for synthetic resumes.
+FIRST_NAMES = ['Jane', 'John', 'Priya', 'Wei', 'Maria', 'Ahmed', 'Olga', 'Carlos', 'Aisha', 'Tom']
+LAST_NAMES = ['Doe', 'Smith', 'Sharma', 'Chen', 'Garcia', 'Khan', 'Ivanova', 'Silva', 'Okafor', 'Brown']
+TITLES = ['Project Manager', 'Software Engineer', 'Paralegal', 'Accountant', 'Data Analyst', 'Attorney']
+SKILLS = ['python', 'java', 'sql', 'excel', 'project management', 'budgeting', 'leadership', 'aws',
+          'scrum', 'communication', 'teamwork', 'negotiation', 'litigation', 'tableau', 'docker']
+UNIVERSITIES = ['Stanford University', 'Harvard University', 'University of Texas', 'MIT', 'Yale University']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Ltd', 'Stark Industries', 'Wayne Enterprises']
+FILLER = ("delivered managed coordinated improved reduced designed launched analyzed supported "
+          "stakeholders clients budget schedule reports process team quality revenue cost "
+          "compliance strategy operations customers product systems").split()
+
+def load_corpus(directory):
+    """
+    Reads every supported resume in `directory` into memory as (name, bytes) pairs.
+    """
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(SUPPORTED_EXTENSIONS):
+            with open(os.path.join(directory, name), 'rb') as f:
+                corpus.append((name, f.read()))
+    return corpus
+
+def synthetic_text(rng):
+    """
+    Builds one plausible plain-text resume.
+    """
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    title = rng.choice(TITLES)
+    lines = [name, title,
+             f"{name.split()[0].lower()}.{rng.randint(1, 999)}@example.com | +1 {rng.randint(200, 999)} 555 {rng.randint(1000, 9999)}",
+             "", "Summary",
+             " ".join(rng.choice(FILLER) for _ in range(rng.randint(20, 60))) + ".",
+             "", "Experience"]
+    for _ in range(rng.randint(1, 5)):
+        lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({rng.randint(2005, 2020)} - {rng.randint(2021, 2025)})")
+        for _ in range(rng.randint(2, 5)):
+            lines.append("- " + " ".join(rng.choice(FILLER) for _ in range(rng.randint(8, 20))))
+    lines += ["", "Education", f"B.Sc., {rng.choice(UNIVERSITIES)}", "",
+              "Skills", ", ".join(rng.sample(SKILLS, rng.randint(3, 8))),
+              "", "Languages", "English" + (", Spanish" if rng.random() < 0.3 else "")]
+    return "\n".join(lines)
+
+def _docx_bytes(text):
+    from docx import Document
+    document = Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def synthetic_corpus(count, seed=0, templates=()):
+    """
+    Generates `count` resumes as (name, bytes) pairs: generated TXT and DOCX resumes,
+    interleaved with the real PDF `templates` (PDFs cannot be generated without extra
+    dependencies) so every extractor is exercised.
+    """
+    rng = random.Random(seed)
+    pdfs = [(name, data) for name, data in templates if name.lower().endswith('.pdf')]
+    corpus = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 2 and pdfs:
+            name, data = pdfs[(i // 3) % len(pdfs)]
+            corpus.append((f"synthetic-{i}-{name}", data))
+        elif kind == 1:
+            corpus.append((f"synthetic-{i}.docx", _docx_bytes(synthetic_text(rng))))
+        else:
+            corpus.append((f"synthetic-{i}.txt", synthetic_text(rng).encode('utf-8')))
+    return corpus
+
+def load_model(name, mode=None):
+    """
+    Installs the spaCy pipeline the benchmark runs with: the app's configured models
+    (None), a named spaCy package (e.g. en_core_web_sm), or "blank" (tokenizer and
+    sentencizer only; runs without any downloaded model, entities are empty).
+    `mode` is the nlp_utils loading mode ("full" or "ner").
+    """
+    if name is None and mode is None:
+        return nlp_utils.get_nlp()
+    if name == 'blank':
+        import spacy
+        nlp = spacy.blank('en')
+        nlp.add_pipe('sentencizer')
+    else:
+        nlp = nlp_utils.load_nlp(models=None if name is None else [name], mode=mode)
+    nlp_utils._nlp = nlp
+    return nlp
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+def summarize(samples):
+    """
+    Latency summary (milliseconds) for one stage.
+    """
+    values = sorted(samples)
+    summary = {f"p{pct}": round(percentile(values, pct) * 1000, 3) for pct in PERCENTILES}
+    summary['mean'] = round(sum(values) / len(values) * 1000, 3) if values else 0.0
+    summary['max'] = round(values[-1] * 1000, 3) if values else 0.0
+    summary['total_s'] = round(sum(values), 4)
+    return summary
+
+def run_stages(corpus, nlp, criteria):
+    """
+    Runs each resume through every stage sequentially, timing each stage separately.
+    Returns (stage -> list of seconds, failed extraction count, outputs), where outputs
+    maps each file to its candidate name and entities (for accuracy comparisons).
+    """
+    timings = {stage: [] for stage in STAGES}
+    failures = 0
+    outputs = {}
+    for name, data in corpus:
+        started = time.perf_counter()
+        text = extract_text_from_file(data, filename=name)
+        timings['extract'].append(time.perf_counter() - started)
+        if is_extraction_error(text):
+            failures += 1
+            continue
+
+        started = time.perf_counter()
+        doc = nlp(ner_text(text))
+        timings['parse'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        entities = extract_entities(text, doc=doc)
+        timings['entities'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        perform_basic_validation(text, doc=doc, entities=entities)
+        timings['validation'].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        name_found = extract_candidate_name(text, doc=doc)
+        timings['name'].append(time.perf_counter() - started)
+
+        # The production path: cheap name tiers first, spaCy only when they fail.
+        started = time.perf_counter()
+        analysis = analyze_resume(text)
+        timings['tiered'].append(time.perf_counter() - started)
+        outputs[name] = {'candidate_name': name_found, 'person': entities['PERSON'], 'org': entities['ORG'],
+                         'tiered_name': analysis['candidate_name'], 'name_tier': analysis['name_tier']}
+
+        started = time.perf_counter()
+        compute_score_robust(text, **criteria)
+        timings['score'].append(time.perf_counter() - started)
+    return timings, failures, outputs
+
+def run_pipeline(corpus, criteria):
+    """
+    Runs the batched production path (pipeline.iter_ingest + scoring) end to end.
+    Returns elapsed seconds.
+    """
+    from pipeline import iter_ingest
+    items = [{'name': name, 'data': data} for name, data in corpus]
+    started = time.perf_counter()
+    for record in iter_ingest(items):
+        if not record['error']:
+            compute_score_robust(record['text'], **criteria)
+    return time.perf_counter() - started
+
+def compare_docx(corpus, rounds=3):
+    """
+    Times every DOCX extraction mode over the corpus's DOCX files, and measures its
+    peak traced memory (separate pass) and the characters of text it recovers.
+    """
+    docs = [data for name, data in corpus if name.lower().endswith('.docx')]
+    modes = {}
+    for mode in DOCX_MODES:
+        samples = []
+        for _ in range(rounds):
+            for data in docs:
+                started = time.perf_counter()
+                extract_text_from_docx(data, mode=mode)
+                samples.append(time.perf_counter() - started)
+        tracemalloc.start()
+        texts = [extract_text_from_docx(data, mode=mode) for data in docs]
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stats = summarize(samples)
+        stats['chars'] = sum(len(text) for text in texts if not text.startswith("Error "))
+        stats['failed'] = sum(text.startswith("Error ") for text in texts)
+        stats['peak_traced_mb'] = round(peak / (1024 * 1024), 2)
+        modes[mode] = stats
+    return {'documents': len(docs), 'rounds': rounds, 'modes': modes}
+
+def _rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def agreement(outputs, baseline_outputs):
+    """
+    Accuracy of a run relative to a baseline run on the same files: the share of
+    identical candidate names, and the mean Jaccard overlap of the ORG entities.
+    """
+    common = [name for name in outputs if name in baseline_outputs]
+    if not common:
+        return None
+    names = sum(outputs[n]['candidate_name'] == baseline_outputs[n]['candidate_name'] for n in common)
+    overlaps = []
+    for n in common:
+        current, base = set(outputs[n]['org']), set(baseline_outputs[n]['org'])
+        overlaps.append(len(current & base) / len(current | base) if current | base else 1.0)
+    return {'documents': len(common), 'candidate_name': round(names / len(common), 4),
+            'org_jaccard': round(sum(overlaps) / len(overlaps), 4)}
+
+def benchmark(corpus, model=None, criteria=None, pipeline=False, trace_memory=True, nlp_mode=None, docx=False):
+    """
+    Benchmarks the stages over `corpus` and returns the report dict.
+    """
+    criteria = criteria or DEFAULT_CRITERIA
+    started = time.perf_counter()
+    nlp = load_model(model, mode=nlp_mode)
+    model_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    timings, failures, outputs = run_stages(corpus, nlp, criteria)
+    elapsed = time.perf_counter() - started
+    peak = None
+    if trace_memory:
+        # Separate pass: tracemalloc slows allocation-heavy stages down several times.
+        tracemalloc.start()
+        run_stages(corpus, nlp, criteria)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    report = {
+        'commit': _git_commit(),
+        'model': model or 'default',
+        'nlp_mode': nlp_mode or nlp_utils.NLP_MODE,
+        'pipe_names': list(nlp.pipe_names),
+        'ner_prefix_chars': nlp_utils.NER_PREFIX_CHARS,
+        'documents': len(corpus),
+        'failed_extractions': failures,
+        'model_load_s': round(model_seconds, 3),
+        'elapsed_s': round(elapsed, 3),
+        'resumes_per_s': round(len(corpus) / elapsed, 2) if elapsed else 0.0,
+        'peak_traced_mb': round(peak / (1024 * 1024), 2) if peak is not None else None,
+        'max_rss_mb': _rss_mb(),
+        'stages': {stage: summarize(samples) for stage, samples in timings.items()},
+        'outputs': outputs,
+        'name_tiers': dict(Counter(output['name_tier'] for output in outputs.values())),
+    }
+    if pipeline:
+        pipeline_seconds = run_pipeline(corpus, criteria)
+        report['pipeline_elapsed_s'] = round(pipeline_seconds, 3)
+        report['pipeline_resumes_per_s'] = round(len(corpus) / pipeline_seconds, 2) if pipeline_seconds else 0.0
+    if docx:
+        report['docx'] = compare_docx(corpus)
+    return report
+
+def print_report(report, baseline=None):
+    print(f"commit {report['commit']}  model {report['model']} ({report['nlp_mode']}: {', '.join(report['pipe_names'])})"
+          f"  ner prefix {report['ner_prefix_chars'] or 'off'}  documents {report['documents']}"
+          f"  failed {report['failed_extractions']}")
+    header = f"{'stage':<12}" + "".join(f"{col:>11}" for col in ('p50 ms', 'p90 ms', 'p99 ms', 'mean ms', 'max ms'))
+    if baseline:
+        header += f"{'p50 vs base':>13}"
+    print(header)
+    for stage, stats in report['stages'].items():
+        line = f"{stage:<12}" + "".join(f"{stats[key]:>11.3f}" for key in ('p50', 'p90', 'p99', 'mean', 'max'))
+        base = (baseline or {}).get('stages', {}).get(stage)
+        if base and base['p50']:
+            line += f"{(stats['p50'] - base['p50']) / base['p50'] * 100:>+12.1f}%"
+        print(line)
+    print(f"throughput  {report['resumes_per_s']} resumes/s ({report['elapsed_s']}s, model load {report['model_load_s']}s)")
+    if baseline:
+        print(f"baseline    {baseline['resumes_per_s']} resumes/s (commit {baseline.get('commit')})")
+        agreed = agreement(report['outputs'], baseline.get('outputs', {}))
+        if agreed:
+            print(f"accuracy    candidate names {agreed['candidate_name']:.1%} identical, ORG overlap "
+                  f"{agreed['org_jaccard']:.1%} (vs baseline, {agreed['documents']} documents)")
+    if 'pipeline_resumes_per_s' in report:
+        print(f"pipeline    {report['pipeline_resumes_per_s']} resumes/s ({report['pipeline_elapsed_s']}s)")
+    print(f"name tiers  {', '.join(f'{tier} {count}' for tier, count in sorted(report['name_tiers'].items()))}")
+    print(f"memory      peak traced {report['peak_traced_mb']} MB, max RSS {report['max_rss_mb']} MB")
+    if report.get('docx'):
+        docx = report['docx']
+        print(f"docx        {docx['documents']} documents x {docx['rounds']} rounds")
+        for mode, stats in docx['modes'].items():
+            print(f"  {mode:<12} p50 {stats['p50']:.3f} ms  mean {stats['mean']:.3f} ms  "
+                  f"peak traced {stats['peak_traced_mb']} MB  text {stats['chars']} chars  failed {stats['failed']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the resume ingest-and-score pipeline.")
+    parser.add_argument('--corpus', default='Resumes', help="directory of real resumes (default: Resumes)")
+    parser.add_argument('--no-corpus', action='store_true', help="skip the real corpus")
+    parser.add_argument('--synthetic', type=int, default=0, help="add N synthetic resumes")
+    parser.add_argument('--repeat', type=int, default=1, help="repeat the real corpus N times")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the synthetic corpus")
+    parser.add_argument('--model', default=None,
+                        help='spaCy package to load, or "blank" (default: the app\'s trf/md loader)')
+    parser.add_argument('--small', action='store_true', help="shortcut for --model en_core_web_sm")
+    parser.add_argument('--nlp-mode', choices=('full', 'ner'), default=None,
+                        help="spaCy loading mode (default: RESUME_NLP_MODE)")
+    parser.add_argument('--ner-prefix', type=int, default=None,
+                        help="only run NER on the first N characters (default: RESUME_NER_PREFIX_CHARS)")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="also time the batched iter_ingest path end to end")
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help="skip the tracemalloc pass that measures peak memory")
+    parser.add_argument('--docx', action='store_true',
+                        help="also compare the DOCX extractors (python-docx vs streaming XML)")
+    parser.add_argument('--json', help="write the report to this file")
+    parser.add_argument('--compare', help="compare against a report written by --json")
+    args = parser.parse_args(argv)
+
+    real = [] if args.no_corpus else load_corpus(args.corpus)
+    corpus = real * max(args.repeat, 1)
+    if args.synthetic:
+        corpus += synthetic_corpus(args.synthetic, seed=args.seed, templates=real)
+    if not corpus:
+        parser.error("the corpus is empty")
+
+    if args.ner_prefix is not None:
+        nlp_utils.NER_PREFIX_CHARS = args.ner_prefix
+    model = 'en_core_web_sm' if args.small else args.model
+    report = benchmark(corpus, model=model, pipeline=args.pipeline, trace_memory=not args.no_tracemalloc,
+                       nlp_mode=args.nlp_mode, docx=args.docx)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import numpy as np
+from scoring import ATS_KEYWORDS, CRITERIA_KEYS, SubstringMatcher, WordMatcher, get_scorer
+
+class BulkScorer:
+    """
+    Scores a pool of resumes against many job profiles at once.
+
+    The profiles' keywords form one vocabulary. Each resume is matched against it
+    once (raw text or the InvertedIndex), giving a document-term matrix, and each
+    profile's criteria become columns of keyword weight matrices, so every score
+    component for all candidates x jobs is a single matrix product followed by the
+    compute_score_robust rules applied element-wise.
+
+    Like a ResumeScorer, it exposes `substring_terms` and `bonus_terms`, so
+    InvertedIndex.match(bulk_scorer, doc_ids) produces its input directly.
+    """
+
+    def __init__(self, scorers):
+        self.scorers = list(scorers)
+        self.substring_terms = sorted(set().union(*(s.substring_terms for s in self.scorers)))
+        self.bonus_terms = sorted(set().union(*(s.bonus_terms for s in self.scorers)))
+        self._substring_column = {term: i for i, term in enumerate(self.substring_terms)}
+        self._bonus_column = {term: i for i, term in enumerate(self.bonus_terms)}
+        self._substring_matcher = None
+        self._bonus_matcher = None
+
+        jobs = len(self.scorers)
+        n_sub = len(self.substring_terms)
+        # Term weight matrices (terms x jobs); repeated keywords count repeatedly, as in ResumeScorer.hits.
+        self.skills_weights = np.zeros((n_sub, jobs))
+        self.title_word_weights = np.zeros((n_sub, jobs))
+        self.title_weights = np.zeros((n_sub, jobs))
+        self.language_weights = np.zeros((n_sub, jobs))
+        self.ats_weights = np.zeros((n_sub, jobs))
+        self.bonus_weights = np.zeros((len(self.bonus_terms), jobs))
+        for j, scorer in enumerate(self.scorers):
+            for skill in scorer.required_skills:
+                self.skills_weights[self._substring_column[skill], j] += 1
+            for word in scorer.job_title_words:
+                self.title_word_weights[self._substring_column[word], j] += 1
+            if scorer.job_title:
+                self.title_weights[self._substring_column[scorer.job_title], j] = 1
+            for language in scorer.languages:
+                self.language_weights[self._substring_column[language], j] += 1
+            if scorer.enable_ats:
+                for word in ATS_KEYWORDS:
+                    self.ats_weights[self._substring_column[word], j] += 1
+            for keyword, points in scorer.bonus_keywords.items():
+                self.bonus_weights[self._bonus_column[keyword], j] = points
+
+        # Per-job parameters as row vectors.
+        def vector(values):
+            return np.array(values, dtype=float)
+        self.n_skills = vector([len(s.required_skills) for s in self.scorers])
+        self.min_skills = vector([s.min_skills or 0 for s in self.scorers])
+        self.has_title = np.array([bool(s.job_title) for s in self.scorers])
+        self.blank_title = np.array([s.blank_job_title for s in self.scorers])
+        self.n_title_words = vector([len(s.job_title_words) for s in self.scorers])
+        self.n_languages = vector([len(s.languages) for s in self.scorers])
+        self.score_languages = np.array([s.has_languages and bool(s.languages) for s in self.scorers])
+        self.min_languages = vector([s.min_languages or 0 for s in self.scorers])
+        self.enable_bonus = np.array([s.enable_bonus for s in self.scorers])
+        self.enable_ats = np.array([s.enable_ats for s in self.scorers])
+
+    @classmethod
+    def from_criteria(cls, profiles):
+        """
+        Builds the scorer from criteria dicts (the compute_score_robust keyword arguments).
+        """
+        return cls(get_scorer(*(profile[key] for key in CRITERIA_KEYS)) for profile in profiles)
+
+    def matrices(self, found):
+        """
+        Builds the document-term matrices from per-document matches.
+
+        Args:
+            found (list): (found substring terms, found bonus keywords) per document.
+
+        Returns:
+            tuple: (substring matrix, bonus matrix), documents x terms, 0/1 floats.
+        """
+        substring = np.zeros((len(found), len(self.substring_terms)))
+        bonus = np.zeros((len(found), len(self.bonus_terms)))
+        for i, (found_terms, found_bonus) in enumerate(found):
+            substring[i, [self._substring_column[t] for t in found_terms if t in self._substring_column]] = 1
+            bonus[i, [self._bonus_column[t] for t in found_bonus if t in self._bonus_column]] = 1
+        return substring, bonus
+
+    def match_texts(self, texts):
+        """
+        Matches raw resume texts against the combined vocabulary (one scan per matcher).
+        """
+        if self._substring_matcher is None:
+            self._substring_matcher = SubstringMatcher(self.substring_terms)
+            self._bonus_matcher = WordMatcher(self.bonus_terms)
+        found = []
+        for text in texts:
+            base_text = str(text).lower() if text else ""
+            found.append((self._substring_matcher.find(base_text), self._bonus_matcher.find(base_text)))
+        return found
+
+    def components(self, substring, bonus):
+        """
+        Computes every score component for all documents x jobs.
+
+        Returns:
+            dict: component name -> documents x jobs array, with the same keys and
+            rules as the compute_score_robust breakdown (unrounded).
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            matched_skills = substring @ self.skills_weights
+            by_min = np.where(matched_skills >= self.min_skills, 4.0, matched_skills / self.min_skills * 4)
+            by_count = matched_skills / self.n_skills * 4
+            skills = np.where(self.n_skills > 0,
+                              np.minimum(np.where(self.min_skills > 0, by_min, by_count), 4), 0.0)
+
+            title_exact = substring @ self.title_weights
+            title_words = np.minimum(substring @ self.title_word_weights / self.n_title_words, 1)
+            job_title = np.where(title_exact > 0, 1.0, np.where(self.n_title_words > 0, title_words, 0.0))
+            job_title = np.where(self.has_title, job_title, np.where(self.blank_title, 1.0, 0.0))
+
+            matched_languages = substring @ self.language_weights
+            languages = np.where(self.min_languages > 0,
+                                 np.where(matched_languages >= self.min_languages, 1.0,
+                                          matched_languages / self.min_languages),
+                                 matched_languages / self.n_languages)
+            languages = np.where(self.score_languages, languages, 1.0)
+
+            bonus_points = np.where(self.enable_bonus, np.minimum(bonus @ self.bonus_weights, 2), 2.0)
+            ats = np.where(self.enable_ats,
+                           np.minimum((substring @ self.ats_weights) / len(ATS_KEYWORDS) * 2, 2), 2.0)
+
+        skills_job = skills + job_title
+        raw_total = skills_job + languages + bonus_points + ats
+        return {
+            'required_skills': skills,
+            'job_title': job_title,
+            'skills_job': skills_job,
+            'languages': languages,
+            'bonus': bonus_points,
+            'ats': ats,
+            'raw_total': raw_total,
+        }
+
+    def score(self, found):
+        """
+        Scores documents given their matches (see match_texts / InvertedIndex.match).
+        """
+        return ScoreTable(self.components(*self.matrices(found)))
+
+    def score_texts(self, texts):
+        return self.score(self.match_texts(texts))
+
+class ScoreTable:
+    """
+    Candidates x jobs scores with per-cell breakdowns.
+    """
+
+    total_max = 10
+
+    def __init__(self, components):
+        self.components = components
+        self.scores = components['raw_total'] / self.total_max * 10
+
+    def breakdown(self, doc, job):
+        breakdown = {name: round(float(values[doc, job]), 2) for name, values in self.components.items()}
+        breakdown['total_max'] = self.total_max
+        return breakdown
+
+    def ranked(self, job, top=None):
+        """
+        Returns (document row, score, breakdown) tuples for one job, highest score first
+        (ties keep the input order, like the stable sort used for uploads).
+        """
+        column = self.scores[:, job]
+        order = np.argsort(-np.round(column, 2), kind='stable')
+        if top:
+            order = order[:top]
+        return [(int(doc), round(float(column[doc]), 2), self.breakdown(doc, job)) for doc in order]
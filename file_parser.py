@@ -1,49 +1,343 @@
+import io
 import os
+import re
+import zipfile
+import multiprocessing
+from xml.etree.ElementTree import iterparse
 from pdfminer.high_level import extract_text as pdf_extract_text
+from pdfminer.layout import LAParams
+from pdfminer.converter import TextConverter
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.pdfpage import PDFPage
 from docx import Document
 
-def extract_text_from_pdf(file_path):
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+# Upload limits.
+MAX_FILE_BYTES = int(os.environ.get('RESUME_MAX_FILE_BYTES', 20 * 1024 * 1024))
+ZIP_MAX_MEMBERS = int(os.environ.get('RESUME_ZIP_MAX_MEMBERS', 5000))
+ZIP_MAX_TOTAL_BYTES = int(os.environ.get('RESUME_ZIP_MAX_TOTAL_BYTES', 1024 * 1024 * 1024))
+ZIP_MAX_RATIO = float(os.environ.get('RESUME_ZIP_MAX_RATIO', 100))
+READ_CHUNK = 1024 * 1024
+
+# PDF extraction:
+#   "full" - pdfminer's default layout analysis (slowest, best reading order)
+#   "fast" - layout analysis without the reading-order pass and vertical text detection
+#   "raw"  - no layout analysis at all (fastest; text follows the PDF's drawing order)
+PDF_MODE = os.environ.get('RESUME_PDF_MODE', 'full')
+PDF_MAX_PAGES = int(os.environ.get('RESUME_PDF_MAX_PAGES', 0))   # 0 = all pages
+PDF_TIMEOUT = float(os.environ.get('RESUME_PDF_TIMEOUT', 0))     # seconds; 0 = no subprocess/timeout
+# DOCX extraction:
+#   "stream"      - incremental parse of the document XML straight from the archive,
+#                   including tables, text boxes, content controls, headers and footers
+#   "python-docx" - python-docx's body paragraphs only (tables and headers are dropped)
+DOCX_MODE = os.environ.get('RESUME_DOCX_MODE', 'stream')
+# Compression ratios are only checked for members that inflate beyond this size.
+RATIO_CHECK_MIN_BYTES = 1024 * 1024
+
+# Extractors report failures as text starting with one of these prefixes.
+EXTRACTION_ERROR_PREFIXES = ("Error extracting PDF text:", "Error extracting DOCX text:",
+                             "Error reading TXT file:", "Unsupported file format.")
+
+def is_extraction_error(text):
+    """
+    Whether extract_text_from_file returned a failure message instead of resume text.
+    """
+    return text.startswith(EXTRACTION_ERROR_PREFIXES)
+
+def _as_source(source):
     """
-    Extracts text from a PDF file using pdfminer.six.
+    Accepts a file path, raw bytes or a binary file-like object and returns
+    something pdfminer/python-docx can open (a path or a binary stream).
     """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(bytes(source))
+    return source
+
+def _pdf_text(source, mode, max_pages):
+    """
+    Runs pdfminer with the layout settings for the given extraction mode.
+    """
+    if mode == 'full':
+        return pdf_extract_text(_as_source(source), maxpages=max_pages)
+    if mode == 'fast':
+        laparams = LAParams(boxes_flow=None, detect_vertical=False, all_texts=False)
+    elif mode == 'raw':
+        laparams = None
+    else:
+        raise ValueError(f"Unknown PDF extraction mode: {mode}")
+    source = _as_source(source)
+    fp = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        output = io.StringIO()
+        rsrcmgr = PDFResourceManager(caching=True)
+        device = TextConverter(rsrcmgr, output, laparams=laparams)
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+        for page in PDFPage.get_pages(fp, maxpages=max_pages, caching=True):
+            interpreter.process_page(page)
+        device.close()
+        return output.getvalue()
+    finally:
+        if fp is not source:
+            fp.close()
+
+def _pdf_text_child(conn, source, mode, max_pages):
+    # Runs in a child process; sends ("ok", text) or ("error", message) back.
     try:
-        text = pdf_extract_text(file_path)
-        return text
+        conn.send(("ok", _pdf_text(source, mode, max_pages)))
+    except Exception as e:
+        conn.send(("error", str(e)))
+    finally:
+        conn.close()
+
+def _pdf_text_with_timeout(source, mode, max_pages, timeout):
+    """
+    Extracts in a child process and kills it if it runs longer than `timeout`
+    seconds, so a pathological PDF cannot stall the worker.
+    """
+    if hasattr(source, 'read'):
+        source = source.read()
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_pdf_text_child, args=(sender, source, mode, max_pages), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise TimeoutError(f"PDF extraction timed out after {timeout:g}s")
+        status, payload = receiver.recv()
+    except EOFError:
+        raise RuntimeError("PDF extraction process exited unexpectedly")
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.terminate()
+        process.join()
+    if status != "ok":
+        raise RuntimeError(payload)
+    return payload
+
+def extract_text_from_pdf(source, mode=None, max_pages=None, timeout=None):
+    """
+    Extracts text from a PDF (path, bytes or file-like) using pdfminer.six.
+
+    Args:
+        mode (str): "full", "fast" or "raw" (defaults to RESUME_PDF_MODE).
+        max_pages (int): only extract the first N pages; 0 means all (defaults to RESUME_PDF_MAX_PAGES).
+        timeout (float): when positive, extract in a subprocess killed after this many
+            seconds (defaults to RESUME_PDF_TIMEOUT).
+    """
+    mode = PDF_MODE if mode is None else mode
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    timeout = PDF_TIMEOUT if timeout is None else timeout
+    try:
+        if timeout and timeout > 0:
+            return _pdf_text_with_timeout(source, mode, max_pages, timeout)
+        return _pdf_text(source, mode, max_pages)
     except Exception as e:
         return f"Error extracting PDF text: {e}"
 
-def extract_text_from_docx(file_path):
+WORD_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+FALLBACK_TAG = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+DOCX_PART_RE = re.compile(r'word/(header|footer)(\d*)\.xml$')
+
+def _docx_part_lines(stream):
     """
-    Extracts text from a DOCX file using python-docx.
+    Streams one WordprocessingML part with iterparse and yields its paragraphs as
+    lines, in document order. Table cells, text boxes and content controls hold
+    ordinary paragraphs, so they come out where they appear; paragraphs nested in a
+    text box are yielded before the paragraph anchoring it. mc:Fallback copies
+    (legacy VML duplicates of text boxes) are skipped. Tabs and breaks count only
+    inside runs, so tab-stop definitions (w:pPr/w:tabs/w:tab) add no text.
     """
+    paragraphs = []   # text pieces of the open paragraphs (text boxes nest them)
+    open_tags = []    # tags of the elements enclosing the current one
+    fallback = 0
+    for event, elem in iterparse(stream, events=('start', 'end')):
+        tag = elem.tag
+        if event == 'start':
+            open_tags.append(tag)
+            if tag == FALLBACK_TAG:
+                fallback += 1
+            elif tag == WORD_NS + 'p' and not fallback:
+                paragraphs.append([])
+            continue
+        open_tags.pop()
+        in_run = bool(open_tags) and open_tags[-1] == WORD_NS + 'r'
+        if tag == FALLBACK_TAG:
+            fallback -= 1
+        elif fallback or not paragraphs:
+            pass
+        elif tag == WORD_NS + 't':
+            paragraphs[-1].append(elem.text or '')
+        elif tag == WORD_NS + 'tab' and in_run:
+            paragraphs[-1].append('\t')
+        elif tag in (WORD_NS + 'br', WORD_NS + 'cr') and in_run:
+            paragraphs[-1].append('\n')
+        elif tag == WORD_NS + 'p':
+            yield ''.join(paragraphs.pop())
+        elem.clear()
+
+def _docx_stream_text(source):
+    """
+    Extracts DOCX text from word/document.xml plus the headers (first) and footers
+    (last), each part parsed incrementally from the archive. Headers or footers
+    repeated for first/even pages are included once.
+    """
+    with zipfile.ZipFile(_as_source(source)) as archive:
+        parts = {'header': [], 'footer': []}
+        for name in archive.namelist():
+            match = DOCX_PART_RE.match(name)
+            if match:
+                parts[match.group(1)].append((int(match.group(2) or 0), name))
+
+        def read(names):
+            seen = set()
+            for _, name in sorted(names):
+                with archive.open(name) as stream:
+                    text = "\n".join(line for line in _docx_part_lines(stream) if line.strip())
+                if text and text not in seen:
+                    seen.add(text)
+                    yield text
+
+        body = []
+        with archive.open('word/document.xml') as stream:
+            for line in _docx_part_lines(stream):
+                # Runs of empty paragraphs (layout spacing) collapse to one blank line.
+                if line.strip() or (body and body[-1].strip()):
+                    body.append(line)
+        return "\n".join([*read(parts['header']), *body, *read(parts['footer'])])
+
+def extract_text_from_docx(source, mode=None):
+    """
+    Extracts text from a DOCX (path, bytes or file-like).
+
+    Args:
+        mode (str): "stream" or "python-docx" (defaults to RESUME_DOCX_MODE).
+    """
+    mode = DOCX_MODE if mode is None else mode
     try:
-        document = Document(file_path)
-        full_text = [para.text for para in document.paragraphs]
-        return "\n".join(full_text)
+        if mode == 'stream':
+            return _docx_stream_text(source)
+        if mode == 'python-docx':
+            document = Document(_as_source(source))
+            full_text = [para.text for para in document.paragraphs]
+            return "\n".join(full_text)
+        raise ValueError(f"Unknown DOCX extraction mode: {mode}")
     except Exception as e:
         return f"Error extracting DOCX text: {e}"
 
-def extract_text_from_txt(file_path):
+def _decode_text(data):
+    """
+    Decodes TXT bytes as UTF-8, falling back to Windows-1252 (common for exported resumes),
+    with universal newlines like text-mode open().
+    """
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("cp1252", errors="replace")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+def extract_text_from_txt(source):
     """
-    Reads text from a TXT file.
+    Reads text from a TXT file (path, bytes or file-like).
     """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return _decode_text(bytes(source))
+        if hasattr(source, "read"):
+            data = source.read()
+            return _decode_text(data) if isinstance(data, bytes) else data
+        with open(source, "rb") as f:
+            return _decode_text(f.read())
     except Exception as e:
         return f"Error reading TXT file: {e}"
 
-def extract_text_from_file(file_path):
+def extract_text_from_file(source, filename=None):
     """
     Determines the file type based on its extension and extracts text.
-    Supports PDF, DOCX, and TXT files.
+    Supports PDF, DOCX, and TXT files given as a path, or as bytes / a binary
+    file-like object together with the original filename.
     """
-    file_path_lower = file_path.lower()
+    name = filename if filename is not None else source
+    if not isinstance(name, (str, os.PathLike)):
+        return "Unsupported file format."
+    file_path_lower = os.fspath(name).lower()
     if file_path_lower.endswith('.pdf'):
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(source)
     elif file_path_lower.endswith('.docx'):
-        return extract_text_from_docx(file_path)
+        return extract_text_from_docx(source)
     elif file_path_lower.endswith('.txt'):
-        return extract_text_from_txt(file_path)
+        return extract_text_from_txt(source)
     else:
         return "Unsupported file format."
+
+def read_limited(stream, limit=MAX_FILE_BYTES):
+    """
+    Reads a binary stream fully, raising ValueError once more than `limit` bytes arrive.
+    """
+    buffer = io.BytesIO()
+    while True:
+        chunk = stream.read(READ_CHUNK)
+        if not chunk:
+            break
+        buffer.write(chunk)
+        if buffer.tell() > limit:
+            raise ValueError(f"File exceeds the {limit} byte limit")
+    return buffer.getvalue()
+
+def count_zip_resumes(zip_source, max_members=ZIP_MAX_MEMBERS):
+    """
+    Number of entries iter_zip_resumes will yield for an archive (read from the
+    central directory, nothing is decompressed); 1 for an archive it rejects outright.
+    """
+    with zipfile.ZipFile(_as_source(zip_source), 'r') as zip_ref:
+        members = zip_ref.infolist()
+        if len(members) > max_members:
+            return 1
+        return sum(1 for info in members if not info.is_dir() and info.filename.endswith(SUPPORTED_EXTENSIONS))
+
+def iter_zip_resumes(zip_source, max_members=ZIP_MAX_MEMBERS, max_file_bytes=MAX_FILE_BYTES,
+                     max_total_bytes=ZIP_MAX_TOTAL_BYTES, max_ratio=ZIP_MAX_RATIO, skip=None):
+    """
+    Streams supported resumes out of a ZIP archive (path, bytes or seekable file-like)
+    without writing anything to disk.
+
+    Zip-bomb guards: the archive may hold at most `max_members` entries, each resume is
+    limited to `max_file_bytes` (and, when large, a `max_ratio` compression ratio), and the total
+    uncompressed size is capped at `max_total_bytes`. Sizes are enforced on the bytes
+    actually decompressed, not just the (forgeable) sizes declared in the archive.
+    Members whose name `skip(name)` accepts are passed over without being read.
+
+    Yields:
+        tuple: (member name, bytes or None, error message or None)
+    """
+    total = 0
+    with zipfile.ZipFile(_as_source(zip_source), 'r') as zip_ref:
+        members = zip_ref.infolist()
+        if len(members) > max_members:
+            raise ValueError(f"ZIP archive has {len(members)} entries (limit {max_members})")
+        for info in members:
+            name = info.filename
+            if info.is_dir() or not name.endswith(SUPPORTED_EXTENSIONS):
+                continue
+            if skip is not None and skip(name):
+                continue
+            if info.file_size > max_file_bytes:
+                yield name, None, f"Error processing file: file exceeds the {max_file_bytes} byte limit"
+                continue
+            if (info.file_size > RATIO_CHECK_MIN_BYTES and info.compress_size
+                    and info.file_size / info.compress_size > max_ratio):
+                yield name, None, "Error processing file: suspicious compression ratio"
+                continue
+            if total + info.file_size > max_total_bytes:
+                raise ValueError(f"ZIP archive exceeds the {max_total_bytes} byte uncompressed limit")
+            try:
+                with zip_ref.open(info) as member:
+                    data = read_limited(member, min(max_file_bytes, max_total_bytes - total))
+            except Exception as e:
+                yield name, None, f"Error processing file: {str(e)}"
+                continue
+            total += len(data)
+            yield name, data, None
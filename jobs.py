@@ -0,0 +1,172 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of upload jobs processed concurrently in the background.
+JOB_WORKERS = int(os.environ.get('RESUME_JOB_WORKERS', 2))
+# Finished jobs stay in memory this long; their results are persisted by the caller.
+JOB_RETENTION = float(os.environ.get('RESUME_JOB_RETENTION', 3600))
+# A running job's snapshot is persisted at most this often (seconds), and jobs
+# running in another worker are polled from the store this often.
+JOB_PERSIST_INTERVAL = float(os.environ.get('RESUME_JOB_PERSIST_INTERVAL', 1.0))
+JOB_POLL_INTERVAL = 0.5
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='resume-job')
+_jobs_lock = threading.Lock()
+JOBS = {}             # Maps job_id -> Job
+
+class Job:
+    """
+    Tracks a background upload job: progress counters and the results
+    completed so far (in completion order).
+
+    With a `persist(job_id, snapshot)` callback, snapshots (see snapshot()) are
+    written on every status change and, throttled, as results arrive, so other
+    workers can follow the job through StoredJob.
+    """
+
+    def __init__(self, total, criteria, job_id=None, persist=None):
+        self.id = job_id or str(uuid.uuid4())
+        self.total = total
+        self.criteria = criteria
+        self.status = 'queued'
+        self.error = None
+        self.results = []
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cond = threading.Condition()
+        self._persist = persist
+        self._persisted_at = 0.0
+
+    @property
+    def processed(self):
+        return len(self.results)
+
+    @property
+    def done(self):
+        return self.status in ('finished', 'failed')
+
+    def add_result(self, result):
+        with self._cond:
+            self.results.append(result)
+            self._cond.notify_all()
+        self.save()
+
+    def set_status(self, status, error=None):
+        with self._cond:
+            self.status = status
+            self.error = error
+            if self.done:
+                self.finished_at = time.time()
+            self._cond.notify_all()
+        self.save(force=True)
+
+    def snapshot(self):
+        """
+        The job's persisted form: criteria, status and the results in completion order.
+        """
+        with self._cond:
+            return {'criteria': self.criteria, 'results': list(self.results), 'status': self.status,
+                    'error': self.error, 'total': self.total}
+
+    def save(self, force=False):
+        if self._persist is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._persisted_at < JOB_PERSIST_INTERVAL:
+            return
+        self._persisted_at = now
+        self._persist(self.id, self.snapshot())
+
+    def ranked_results(self):
+        """
+        Returns a snapshot of the completed results sorted by score (highest first).
+        """
+        with self._cond:
+            results = list(self.results)
+        return sorted(results, key=lambda x: x.get('score', 0), reverse=True)
+
+    def wait_for_results(self, since, timeout=None):
+        """
+        Blocks until results beyond index `since` exist or the job is done.
+        Returns the new results (completion order) and whether the job is done.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: len(self.results) > since or self.done, timeout=timeout)
+            return list(self.results[since:]), self.done
+
+    def progress(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'total': self.total,
+            'processed': self.processed,
+            'progress': round(self.processed / self.total, 4) if self.total else 1.0,
+        }
+
+class StoredJob(Job):
+    """
+    Read-only view of a job run by another worker (or a batch saved before a
+    restart), rebuilt from its persisted snapshot. Waiting for results polls
+    `load(job_id)` for fresh snapshots.
+    """
+
+    def __init__(self, job_id, payload, load):
+        results = payload['results']
+        super().__init__(payload.get('total', len(results)), payload['criteria'], job_id=job_id)
+        self.load = load
+        self._apply(payload)
+
+    def _apply(self, payload):
+        with self._cond:
+            self.results = list(payload['results'])
+            self.status = payload.get('status', 'finished')
+            self.error = payload.get('error')
+
+    def wait_for_results(self, since, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while len(self.results) <= since and not self.done:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            time.sleep(JOB_POLL_INTERVAL)
+            payload = self.load(self.id)
+            if payload is not None:
+                self._apply(payload)
+        return list(self.results[since:]), self.done
+
+def submit_job(total, criteria, work, persist=None):
+    """
+    Creates a job and runs work(job) on the background executor.
+    The work function reports each result through job.add_result();
+    `persist` (see Job) makes the job visible to other workers.
+    """
+    job = Job(total, criteria, persist=persist)
+    with _jobs_lock:
+        _prune_finished()
+        JOBS[job.id] = job
+    job.save(force=True)
+
+    def run():
+        job.set_status('running')
+        try:
+            work(job)
+        except Exception as e:
+            job.set_status('failed', error=str(e))
+        else:
+            job.set_status('finished')
+
+    _executor.submit(run)
+    return job
+
+def _prune_finished():
+    # Caller holds _jobs_lock.
+    cutoff = time.time() - JOB_RETENTION
+    for job_id in [j.id for j in JOBS.values() if j.done and j.finished_at < cutoff]:
+        del JOBS[job_id]
+
+def get_job(job_id):
+    with _jobs_lock:
+        return JOBS.get(job_id)
@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Log one structured timing record per request.
+TIMING_LOG = os.environ.get('RESUME_TIMING_LOG', 'no').strip().lower() in ('yes', '1', 'true')
+
+# Histogram buckets: seconds for timings, bytes for file sizes.
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1024, 10 * 1024, 50 * 1024, 100 * 1024, 500 * 1024, 1024 ** 2, 5 * 1024 ** 2, 20 * 1024 ** 2)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Registry:
+    """
+    Minimal in-process metrics registry: counters and histograms with labels,
+    rendered in the Prometheus text exposition format. Thread-safe; values live
+    per process (each gunicorn worker exposes its own).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}          # name -> (type, help, buckets)
+        self._counters = {}      # (name, labels) -> value
+        self._histograms = {}    # (name, labels) -> [bucket counts..., sum, count]
+
+    def counter(self, name, help_text):
+        self._meta[name] = ('counter', help_text, None)
+
+    def histogram(self, name, help_text, buckets=TIME_BUCKETS):
+        self._meta[name] = ('histogram', help_text, tuple(buckets))
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        buckets = self._meta[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(buckets) + 2)
+            for index, bound in enumerate(buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        """
+        Returns all metrics in the Prometheus text format.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(series) for key, series in self._histograms.items()}
+        lines = []
+        for name, (kind, help_text, buckets) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            for (metric, labels), series in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, count in zip(buckets + (float('inf'),), series[:-2] + [series[-1]]):
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', _format_value(bound))])} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(float(series[-2]))}")
+                lines.append(f"{name}_count{_format_labels(labels)} {series[-1]}")
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+REGISTRY.counter('resume_requests_total', "HTTP requests by endpoint and status code.")
+REGISTRY.histogram('resume_request_seconds', "HTTP request latency by endpoint.")
+REGISTRY.histogram('resume_stage_seconds', "Time spent per pipeline stage (per file where applicable).")
+REGISTRY.counter('resume_cache_requests_total', "Cache lookups by cache and result (hit/miss).")
+REGISTRY.counter('resume_files_total', "Processed resumes by file type and outcome.")
+REGISTRY.counter('resume_name_tier_total', "Candidate names by the tier that resolved them (header, contact, ner, heuristic, none).")
+REGISTRY.histogram('resume_upload_file_bytes', "Size of uploaded resume files.", buckets=SIZE_BUCKETS)
+
+def inc(name, value=1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+def observe(name, value, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+def cache_lookup(cache, hit):
+    REGISTRY.inc('resume_cache_requests_total', cache=cache, result='hit' if hit else 'miss')
+
+def render():
+    return REGISTRY.render()
+
+class StageTimer:
+    """
+    Collects per-stage timings for one request (or background job). Every stage
+    measurement is also observed in the resume_stage_seconds histogram, and
+    log_record() writes the totals as one structured (JSON) log line.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counts = {}
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        REGISTRY.observe('resume_stage_seconds', seconds, endpoint=self.endpoint, stage=stage)
+
+    def count(self, name, value=1):
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    @contextmanager
+    def stage(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - started)
+
+    def record(self, **fields):
+        record = {'endpoint': self.endpoint,
+                  'total_ms': round((time.perf_counter() - self.started) * 1000, 2)}
+        record.update({f"{stage}_ms": round(seconds * 1000, 2) for stage, seconds in self.stages.items()})
+        record.update(self.counts)
+        record.update(fields)
+        return record
+
+    def log_record(self, **fields):
+        if TIMING_LOG:
+            logger.info("timing %s", json.dumps(self.record(**fields), sort_keys=True))
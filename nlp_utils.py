@@ -1,16 +1,87 @@
+import os
 import re
-import spacy
+import time
+import logging
+import threading
 from rapidfuzz import fuzz
+from whitelist import WhitelistIndex
 
-# Attempt to load a transformer-based spaCy model for improved accuracy.
-try:
-    nlp = spacy.load('en_core_web_trf')
-except Exception as e:
-    try:
-        nlp = spacy.load('en_core_web_md')
-    except Exception as e:
-        print("Models 'en_core_web_trf' or 'en_core_web_md' not found. Run: python -m spacy download en_core_web_md")
-        raise
+logger = logging.getLogger(__name__)
+
+# spaCy configuration:
+#   RESUME_SPACY_MODEL - comma-separated models (package names or paths) tried in order
+#   RESUME_NLP_MODE    - "full" loads the whole pipeline, "ner" only what doc.ents needs
+#   RESUME_NER_PREFIX_CHARS - when positive, NER only sees the first N characters
+#       (cut at a line break); the candidate name is near the top, but organizations
+#       and dates further down are then not extracted
+SPACY_MODELS = [m.strip() for m in os.environ.get('RESUME_SPACY_MODEL', 'en_core_web_trf,en_core_web_md').split(',') if m.strip()]
+NLP_MODE = os.environ.get('RESUME_NLP_MODE', 'full')
+NER_PREFIX_CHARS = int(os.environ.get('RESUME_NER_PREFIX_CHARS', 0))
+#   RESUME_NER_POLICY  - "fallback" runs NER only for resumes whose name the cheap
+#       header/contact tiers cannot resolve, on the first RESUME_NAME_NER_PREFIX_CHARS
+#       characters; "always" parses every resume (entities for all of them)
+NER_POLICY = os.environ.get('RESUME_NER_POLICY', 'fallback')
+NAME_NER_PREFIX_CHARS = int(os.environ.get('RESUME_NAME_NER_PREFIX_CHARS', 1000))
+# Components never read by the NER-only code paths (everything here only uses doc.ents).
+NER_EXCLUDE = ['tagger', 'morphologizer', 'parser', 'senter', 'attribute_ruler', 'lemmatizer', 'trainable_lemmatizer']
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+def load_nlp(models=None, mode=None):
+    """
+    Loads the spaCy pipeline, preferring the transformer-based model for improved accuracy.
+
+    Args:
+        models (list): models to try in order (defaults to RESUME_SPACY_MODEL).
+        mode (str): "full" or "ner" (defaults to RESUME_NLP_MODE). In "ner" mode the
+            tagger, parser, lemmatizer and attribute ruler are excluded, and a shared
+            tok2vec/transformer no component listens to any more is disabled.
+    """
+    import spacy
+    models = SPACY_MODELS if models is None else models
+    mode = NLP_MODE if mode is None else mode
+    if mode not in ('full', 'ner'):
+        raise ValueError(f"Unknown NLP mode: {mode}")
+    for name in models:
+        try:
+            nlp = spacy.load(name, exclude=NER_EXCLUDE) if mode == 'ner' else spacy.load(name)
+        except Exception:
+            continue
+        if mode == 'ner':
+            for embedder in ('tok2vec', 'transformer'):
+                if embedder in nlp.pipe_names and getattr(nlp.get_pipe(embedder), 'listening_components', None) == []:
+                    nlp.disable_pipe(embedder)
+        logger.info("Using spaCy model %s (%s mode): %s", name, mode, ", ".join(nlp.pipe_names))
+        return nlp
+    print(f"None of the spaCy models {', '.join(repr(m) for m in models)} could be loaded. "
+          "Run: python -m spacy download en_core_web_md")
+    raise OSError(f"No spaCy model available (tried {', '.join(models)})")
+
+def ner_text(text, prefix_chars=None):
+    """
+    The part of the resume that goes through spaCy: all of it, or the first
+    `prefix_chars` characters (defaults to RESUME_NER_PREFIX_CHARS) ending at a line break.
+    """
+    prefix_chars = NER_PREFIX_CHARS if prefix_chars is None else prefix_chars
+    if prefix_chars <= 0 or len(text) <= prefix_chars:
+        return text
+    cut = text.rfind("\n", 0, prefix_chars)
+    return text[:cut if cut > 0 else prefix_chars]
+
+def get_nlp():
+    """
+    Returns the shared spaCy pipeline, loading it on first use.
+    Load it before forking (see app.warm_up) to share it copy-on-write across workers.
+    """
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                started = time.perf_counter()
+                _nlp = load_nlp()
+                logger.info("Loaded spaCy pipeline in %.2fs", time.perf_counter() - started)
+    return _nlp
 
 WHITELIST_INSTITUTIONS = [
     "Massachusetts Institute of Technology", 
@@ -20,6 +91,11 @@ WHITELIST_INSTITUTIONS = [
 WHITELIST_CERTIFICATIONS = [
     "AWS Certified", "PMP", "Cisco Certified"
 ]
+# Extra whitelist entries, one per line.
+INSTITUTIONS_FILE = os.environ.get('RESUME_INSTITUTIONS_FILE')
+CERTIFICATIONS_FILE = os.environ.get('RESUME_CERTIFICATIONS_FILE')
+INSTITUTION_INDEX = WhitelistIndex.load(WHITELIST_INSTITUTIONS, INSTITUTIONS_FILE)
+CERTIFICATION_INDEX = WhitelistIndex.load(WHITELIST_CERTIFICATIONS, CERTIFICATIONS_FILE)
 
 def clean_candidate_name(name):
     """
@@ -47,40 +123,75 @@ def is_valid_candidate_name(name):
         return False
     return True
 
-def extract_entities(text):
-    doc = nlp(text)
+def analyze_text(text):
+    """
+    Runs the spaCy pipeline over the resume text (see ner_text) exactly once.
+    The returned Doc can be passed to extract_entities, perform_basic_validation
+    and extract_candidate_name so they share a single parse.
+    """
+    return get_nlp()(ner_text(text))
+
+def extract_entities(text, doc=None):
+    if doc is None:
+        doc = analyze_text(text)
     entities = {"PERSON": [], "ORG": [], "DATE": []}
     for ent in doc.ents:
         if ent.label_ in entities:
             entities[ent.label_].append(ent.text)
     return entities
 
+# Contact patterns, compiled once.
+EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+EMAIL_FULL_RE = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+PHONE_RE = re.compile(r'\+?\d[\d -]{7,}\d')
+
 def validate_email(email):
-    pattern = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
-    return bool(pattern.match(email))
+    return bool(EMAIL_FULL_RE.match(email))
 
 def validate_phone(phone):
-    pattern = re.compile(r'\+?\d[\d -]{7,}\d')
-    return bool(pattern.match(phone))
+    return bool(PHONE_RE.match(phone))
+
+def extract_contacts(text):
+    """
+    Scans the text once per pattern for email addresses and phone numbers.
+    """
+    return {
+        "emails": [email for email in EMAIL_RE.findall(text) if validate_email(email)],
+        "phones": [phone for phone in PHONE_RE.findall(text) if validate_phone(phone)],
+    }
 
 def check_against_whitelist(entity, whitelist):
+    if isinstance(whitelist, WhitelistIndex):
+        return entity in whitelist
     for item in whitelist:
         if fuzz.token_set_ratio(entity.lower(), item.lower()) > 80:
             return True
     return False
 
-def perform_basic_validation(text):
-    email_matches = re.findall(r'[\w\.-]+@[\w\.-]+\.\w+', text)
-    phone_matches = re.findall(r'\+?\d[\d -]{7,}\d', text)
-    valid_emails = [email for email in email_matches if validate_email(email)]
-    valid_phones = [phone for phone in phone_matches if validate_phone(phone)]
+def find_institutions(text):
+    """
+    NER-free institution check: short comma/pipe-separated segments of each line are
+    looked up in the institution whitelist (memoized, see whitelist.WhitelistIndex).
+    """
+    segments = []
+    for line in text.splitlines():
+        for segment in re.split(r'[,|;\t\u2022\u2013\u2014]', line):
+            segment = segment.strip()
+            if 2 <= len(segment.split()) <= 8:
+                segments.append(segment)
+    return list(dict.fromkeys(INSTITUTION_INDEX.filter(segments)))
+
+def perform_basic_validation(text, doc=None, entities=None, contacts=None):
+    if contacts is None:
+        contacts = extract_contacts(text)
     
-    entities = extract_entities(text)
-    valid_institutions = [org for org in entities.get("ORG", []) if check_against_whitelist(org, WHITELIST_INSTITUTIONS)]
+    if entities is None:
+        entities = extract_entities(text, doc=doc)
+    valid_institutions = INSTITUTION_INDEX.filter(entities.get("ORG", []))
     
     return {
-        "emails": valid_emails,
-        "phones": valid_phones,
+        "emails": contacts["emails"],
+        "phones": contacts["phones"],
         "valid_institutions": valid_institutions
     }
 
@@ -125,15 +236,19 @@ def is_valid_candidate_name(name):
             return False
     return True
 
-def extract_candidate_name(text):
+# Lines that are exactly one of these are job titles, not candidate names.
+JOB_TITLES = {"ATTORNEY", "LAWYER", "ENGINEER", "MANAGER", "DIRECTOR", "DEVELOPER", "CONSULTANT", "ANALYST"}
+
+def extract_candidate_name(text, doc=None):
     """
     Attempts to extract the candidate's name using a full-document NER approach and filters
     out false positives (like file names or organizational formats) based on the presence
     of periods and disqualifiers. If no valid PERSON entity is found, a fallback heuristic
     examines the first 10 lines.
     """
-    # Full-document NER pass using spaCy.
-    doc = nlp(text)
+    # Full-document NER pass using spaCy (reuses the shared Doc when provided).
+    if doc is None:
+        doc = analyze_text(text)
     persons = [ent.text for ent in doc.ents if ent.label_ == "PERSON"]
     for candidate in persons:
         candidate_clean = clean_candidate_name(candidate)
@@ -148,7 +263,6 @@ def extract_candidate_name(text):
 
     # Fallback: Examine the first 10 lines for a potential candidate name.
     lines = text.splitlines()
-    job_titles = {"ATTORNEY", "LAWYER", "ENGINEER", "MANAGER", "DIRECTOR", "DEVELOPER", "CONSULTANT", "ANALYST"}
     section_headers = {
         "ACTIVITIES", "ACTIVITIES AND INTERESTS", "EXPERIENCE", "EDUCATION",
         "SKILLS", "CERTIFICATIONS", "SUMMARY", "OBJECTIVE", "PROFILE", "CONTACT", "AWARDS", "PROJECTS", "HOBBIES"
@@ -164,7 +278,7 @@ def extract_candidate_name(text):
         if any(ext in line_clean.lower() for ext in ['.pdf', '.doc', '.docx']):
             continue
         candidate_clean = clean_candidate_name(line_clean)
-        if candidate_clean.upper() in job_titles:
+        if candidate_clean.upper() in JOB_TITLES:
             continue
         if '.' in candidate_clean:
             continue
@@ -175,7 +289,6 @@ def extract_candidate_name(text):
 
     # Fallback: Examine the first 10 lines for a potential candidate name.
     lines = text.splitlines()
-    job_titles = {"ATTORNEY", "LAWYER", "ENGINEER", "MANAGER", "DIRECTOR", "DEVELOPER", "CONSULTANT", "ANALYST"}
     section_headers = {
         "ACTIVITIES", "ACTIVITIES AND INTERESTS", "EXPERIENCE", "EDUCATION",
         "SKILLS", "CERTIFICATIONS", "SUMMARY", "OBJECTIVE", "PROFILE", "CONTACT", "AWARDS", "PROJECTS", "HOBBIES"
@@ -191,12 +304,191 @@ def extract_candidate_name(text):
         if any(ext in line_clean.lower() for ext in ['.pdf', '.doc', '.docx']):
             continue
         candidate_clean = clean_candidate_name(line_clean)
-        if candidate_clean.upper() in job_titles:
+        if candidate_clean.upper() in JOB_TITLES:
             continue
         if is_valid_candidate_name(candidate_clean):
             return candidate_clean
     return None
 
+# Words that mark a header line as something other than a person's name: section
+# headings, addresses, job titles and role nouns ("Data Analyst", "Registered Nurse",
+# "ATTORNEY AT LAW") and organisations ("Acme Corporation").
+NON_NAME_WORDS = {
+    "summary", "qualifications", "professional", "experience", "education", "skills", "contact",
+    "objective", "profile", "career", "work", "history", "references", "personal", "information",
+    "details", "technical", "core", "competencies", "curriculum", "vitae", "street", "avenue", "road",
+} | {title.lower() for title in JOB_TITLES} | {
+    "accountant", "administrator", "architect", "assistant", "associate", "auditor", "bookkeeper",
+    "cashier", "chef", "coordinator", "designer", "executive", "intern", "nurse",
+    "officer", "paralegal", "programmer", "recruiter", "representative", "scientist", "secretary",
+    "specialist", "supervisor", "teacher", "technician", "writer", "registered", "certified",
+    "senior", "junior", "principal", "trainee", "freelance",
+    "corporation", "corp", "inc", "ltd", "llc", "company", "group", "university", "college",
+    "school", "institute", "hospital", "solutions", "services", "technologies", "consulting",
+    "at", "of", "and", "for",
+}
+NAME_WORD_RE = re.compile(r"^[^\W\d_][^\W\d_'\-]*(?:['\-][^\W\d_]+)*$")
+HEADER_LINES = 3
+
+def _looks_like_name(line):
+    words = line.split()
+    if not 2 <= len(words) <= 4:
+        return False
+    if not all(NAME_WORD_RE.match(word) for word in words):
+        return False
+    if any(word.lower() in NON_NAME_WORDS for word in words):
+        return False
+    return is_valid_candidate_name(line)
+
+def _agrees_with_email(line, emails):
+    """
+    Whether an email address's local part spells out the line: one of its words
+    ("jane.doe@", "janedoe@", "doe.j@") or first initial plus last word ("jdoe@").
+    """
+    words = [re.sub(r"[^\w]", "", word.lower()) for word in line.split()]
+    for email in emails:
+        local = re.sub(r"[^a-z]", "", email.split('@')[0].lower())
+        if any(len(word) >= 3 and word in local for word in words) or local.startswith(words[0][:1] + words[-1]):
+            return True
+    return False
+
+def header_candidate_name(text, emails):
+    """
+    Tier 1: the name as one of the first few non-empty lines ("JANE DOE"), taken
+    only when an email address agrees with it, so header lines that merely look
+    like names ("Customer Service", "New York") are left to the later tiers.
+    """
+    lines = [line.strip() for line in text.splitlines()[:20] if line.strip()]
+    for line in lines[:HEADER_LINES]:
+        if _looks_like_name(line) and _agrees_with_email(line, emails):
+            return line
+    return None
+
+def contact_candidate_name(text, emails):
+    """
+    Tier 2: a name near the top that shares a word with an email address's local
+    part, also when split over two lines ("LISANDRO" / "MILANESI").
+    """
+    hints = set()
+    for email in emails:
+        hints.update(part for part in re.split(r'[._\-\d]+', email.split('@')[0].lower()) if len(part) >= 3)
+    if not hints:
+        return None
+    lines = [line.strip() for line in text.splitlines()[:20] if line.strip()][:10]
+    for i, line in enumerate(lines):
+        if not any(word.lower() in hints for word in line.split()):
+            continue
+        if _looks_like_name(line):
+            return line
+        if len(line.split()) == 1:
+            for joined in ((lines[i - 1] + " " + line) if i > 0 else None,
+                           (line + " " + lines[i + 1]) if i + 1 < len(lines) else None):
+                if joined and _looks_like_name(joined):
+                    return joined
+    return None
+
+def ner_candidate_name(doc):
+    """
+    Tier 3: the first valid PERSON entity in a parsed Doc.
+    """
+    for ent in doc.ents:
+        if ent.label_ != "PERSON":
+            continue
+        candidate_clean = clean_candidate_name(ent.text)
+        if '.' in candidate_clean:
+            continue
+        if is_valid_candidate_name(candidate_clean):
+            return candidate_clean
+    return None
+
+def cheap_candidate_name(text, contacts=None):
+    """
+    Runs the NER-free tiers. Returns (name, tier) or (None, None).
+    """
+    contacts = contacts if contacts is not None else extract_contacts(text)
+    name = header_candidate_name(text, contacts["emails"])
+    if name:
+        return name, "header"
+    name = contact_candidate_name(text, contacts["emails"])
+    if name:
+        return name, "contact"
+    return None, None
+
+def cheap_tiers(text):
+    """
+    The NER-free part of the analysis, computed once per resume and shared by
+    needs_ner and analyze_resume. Returns (contacts, name, tier).
+    """
+    contacts = extract_contacts(text)
+    return (contacts, *cheap_candidate_name(text, contacts))
+
+def needs_ner(text, policy=None, cheap=None):
+    """
+    Whether analyze_resume needs a spaCy Doc for this resume under the NER policy.
+    `cheap` is the resume's cheap_tiers() result, if already computed.
+    """
+    policy = NER_POLICY if policy is None else policy
+    if policy == 'always':
+        return True
+    return (cheap if cheap is not None else cheap_tiers(text))[1] is None
+
+def ner_input(text, policy=None):
+    """
+    The text to parse for a resume that needs NER: the configured NER portion when
+    every resume is parsed, only the bounded prefix when NER just resolves the name.
+    """
+    policy = NER_POLICY if policy is None else policy
+    if policy == 'always':
+        return ner_text(text)
+    return ner_text(text, NAME_NER_PREFIX_CHARS)
+
+class _NoEntities:
+    # Stands in for a Doc without entities so extract_candidate_name goes straight to its line heuristic.
+    ents = ()
+
+_NO_ENTITIES = _NoEntities()
+
+def analyze_resume(text, doc=None, policy=None, cheap=None):
+    """
+    Produces the shared analysis for a single resume with tiered extraction.
+
+    Contacts come from one scan with the precompiled patterns. The candidate name is
+    resolved by the cheapest tier that is confident: "header" (a leading name line
+    the email address agrees with),
+    "contact" (a top line matching the email address), "ner" (PERSON entities) and
+    finally "heuristic" (the first plausible line among the first 10). spaCy runs
+    (once, or not at all when `doc` is given) only under the "always" policy or when
+    the cheap tiers fail; without a Doc, institutions are matched line by line.
+    `cheap` passes in a cheap_tiers() result so the contact scan is not repeated.
+
+    Returns:
+        dict: {"entities": ..., "validation": ..., "candidate_name": ..., "name_tier": ...}
+    """
+    policy = NER_POLICY if policy is None else policy
+    contacts, candidate_name, tier = cheap if cheap is not None else cheap_tiers(text)
+    if doc is None and (policy == 'always' or candidate_name is None):
+        doc = get_nlp()(ner_input(text, policy))
+    if doc is not None:
+        entities = extract_entities(text, doc=doc)
+    else:
+        entities = {"PERSON": [], "ORG": [], "DATE": []}
+    validation = perform_basic_validation(text, entities=entities, contacts=contacts)
+    if policy != 'always':
+        validation["valid_institutions"] = find_institutions(text)
+    if candidate_name is None and doc is not None:
+        candidate_name = ner_candidate_name(doc)
+        tier = "ner" if candidate_name else None
+    if candidate_name is None:
+        candidate_name = extract_candidate_name(text, doc=doc if doc is not None else _NO_ENTITIES)
+        tier = "heuristic" if candidate_name else "none"
+    return {
+        "entities": entities,
+        "validation": validation,
+        "candidate_name": candidate_name,
+        "name_tier": tier
+    }
+
+
 def extract_cleaned_data(text):
     """
     Extracts key fields from the resume text by searching for section headers
@@ -0,0 +1,126 @@
+import os
+import time
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from file_parser import extract_text_from_file, is_extraction_error
+from nlp_utils import get_nlp, analyze_resume, cheap_tiers, needs_ner, ner_input
+
+# Pipeline tuning.
+EXTRACT_WORKERS = int(os.environ.get('RESUME_EXTRACT_WORKERS', os.cpu_count() or 1))
+NLP_BATCH_SIZE = int(os.environ.get('RESUME_NLP_BATCH_SIZE', 32))
+NLP_N_PROCESS = int(os.environ.get('RESUME_NLP_N_PROCESS', 1))
+
+def _extract_worker(item):
+    """
+    Runs in a worker process: extracts text from a single (name, source) pair,
+    where source is a path or the file's bytes.
+    Returns (text, error, seconds) so one bad file never aborts the whole batch
+    and the extraction time can be reported per file. Failure messages returned by
+    the extractors become the error, never the text.
+    """
+    name, source = item
+    started = time.perf_counter()
+    try:
+        text = extract_text_from_file(source, filename=name)
+    except Exception as e:
+        return "", f"Error processing file: {str(e)}", time.perf_counter() - started
+    if is_extraction_error(text):
+        return "", text, time.perf_counter() - started
+    return text, None, time.perf_counter() - started
+
+@contextmanager
+def extraction_pool(max_workers=None):
+    """
+    A process pool for extract_texts that callers ingesting in chunks keep open
+    across chunks, so worker processes start once per run instead of once per chunk.
+    Yields None when extraction runs in-process (one worker).
+    """
+    max_workers = EXTRACT_WORKERS if max_workers is None else max_workers
+    if max_workers <= 1:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        yield pool
+
+def extract_texts(sources, max_workers=None, pool=None):
+    """
+    Extracts text for all (name, source) pairs, using a pool of worker processes when
+    there is more than one file: `pool` (see extraction_pool) when given, otherwise
+    one started for this call. Yields (text, error, seconds) tuples lazily, in input order.
+    """
+    max_workers = EXTRACT_WORKERS if max_workers is None else max_workers
+    if max_workers <= 1 or len(sources) <= 1:
+        for source in sources:
+            yield _extract_worker(source)
+        return
+    chunksize = max(1, len(sources) // (max_workers * 4))
+    if pool is not None:
+        yield from pool.map(_extract_worker, sources, chunksize=chunksize)
+        return
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(sources))) as pool:
+        yield from pool.map(_extract_worker, sources, chunksize=chunksize)
+
+def iter_ingest(items, batch_size=None, n_process=None, max_workers=None, pool=None):
+    """
+    Batched ingestion of uploaded resumes.
+
+    Stage 1 extracts text for every item in a process pool, stage 2 streams the
+    texts that need NER (see nlp_utils.needs_ner) through spaCy with nlp.pipe, and
+    each resume is turned into the shared analysis (entities, validation, candidate
+    name and the tier that resolved it).
+
+    Args:
+        items (list): dicts with a 'name' key and either the file's bytes under 'data'
+            or its location under 'path'.
+        pool: an extraction_pool() to extract in, shared across calls.
+
+    Yields:
+        dict: the original item plus 'text', 'analysis', 'error', 'extract_seconds' and
+        'nlp_seconds' keys, in input order. nlp_seconds is the spaCy time spent until
+        this doc was ready (a batch's parse is counted on its first doc) plus its analysis.
+    """
+    batch_size = NLP_BATCH_SIZE if batch_size is None else batch_size
+    n_process = NLP_N_PROCESS if n_process is None else n_process
+    sources = [(item['name'], item['data'] if item.get('data') is not None else item['path']) for item in items]
+    extracted = extract_texts(sources, max_workers=max_workers, pool=pool)
+    waited = [0.0]   # time nlp.pipe spent blocked on extraction, excluded from nlp_seconds
+
+    def stream():
+        # Failed extractions still flow through nlp.pipe (as empty docs) to keep ordering simple.
+        pairs = zip(items, extracted)
+        while True:
+            started = time.perf_counter()
+            try:
+                item, (text, error, seconds) = next(pairs)
+            except StopIteration:
+                return
+            finally:
+                waited[0] += time.perf_counter() - started
+            # Resumes the cheap name tiers resolve (and failed extractions) pass through
+            # as empty docs to keep ordering simple; the full text travels in the context.
+            # Contacts and the cheap name tiers are computed once and reused by the analysis.
+            cheap = None if error else cheap_tiers(text)
+            parse = not error and needs_ner(text, cheap=cheap)
+            yield (ner_input(text) if parse else ""), (item, text, error, seconds, parse, cheap)
+
+    docs = get_nlp().pipe(stream(), as_tuples=True, batch_size=batch_size, n_process=n_process)
+    while True:
+        started = time.perf_counter()
+        waited_before = waited[0]
+        try:
+            doc, (item, text, error, seconds, parse, cheap) = next(docs)
+        except StopIteration:
+            return
+        record = dict(item)
+        record['text'] = text
+        record['error'] = error
+        record['extract_seconds'] = seconds
+        record['analysis'] = None if error else analyze_resume(text, doc=doc if parse else None, cheap=cheap)
+        record['nlp_seconds'] = max(0.0, time.perf_counter() - started - (waited[0] - waited_before))
+        yield record
+
+def ingest(items, **kwargs):
+    """
+    Convenience wrapper returning the list produced by iter_ingest.
+    """
+    return list(iter_ingest(items, **kwargs))
@@ -0,0 +1,194 @@
+import re
+import threading
+
+# Words and individual punctuation characters (so "c++" and "c#" stay searchable).
+TOKEN_RE = re.compile(r'\w+|[^\w\s]')
+
+def tokenize(text):
+    """
+    Lowercases and tokenizes text into words and single punctuation characters.
+    """
+    return TOKEN_RE.findall(str(text).lower()) if text else []
+
+def tokenize_gaps(text):
+    """
+    Like tokenize, but also returns for each token the whitespace between it and the
+    previous one ('' when they touch; None for the first token).
+    """
+    text = str(text).lower() if text else ""
+    tokens = []
+    gaps = []
+    end = None
+    for match in TOKEN_RE.finditer(text):
+        tokens.append(match.group())
+        gaps.append(None if end is None else text[end:match.start()])
+        end = match.end()
+    return tokens, gaps
+
+def is_word(token):
+    return bool(re.match(r'\w', token))
+
+class InvertedIndex:
+    """
+    In-memory positional inverted index over resume texts (term -> {doc_id: [positions]}).
+
+    It answers the same questions a ResumeScorer asks of the raw text, so new criteria
+    can be applied to already uploaded resumes without re-reading files or re-running spaCy:
+      - substring terms match when the keyword occurs inside the token stream
+        (first/last keyword tokens may be partial words, like `keyword in text`);
+      - bonus terms match on whole tokens only (word-boundary semantics).
+    The whitespace between tokens is indexed too, so a keyword's tokens only match
+    when they are separated exactly as in the keyword: "node.js" does not match
+    "node . js" and "project management" does not match across a line break. Bonus keywords starting or ending with punctuation follow the
+    \\b...\\b edge rule of WordMatcher: ".net" needs a word character right before
+    it ("asp.net"), "c++" one right after it.
+    """
+
+    def __init__(self):
+        self._postings = {}    # term -> {doc_id: [positions]}
+        self._doc_terms = {}   # doc_id -> set of terms (for removal)
+        self._gaps = {}        # doc_id -> {position: whitespace before the token}, single spaces omitted
+        self._word_before = {} # doc_id -> positions glued to a preceding word token
+        self._word_after = {}  # doc_id -> positions followed by a glued word token
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id, text):
+        with self._lock:
+            if doc_id in self._doc_terms:
+                self.remove(doc_id)
+            tokens, gaps = tokenize_gaps(text)
+            positions = {}
+            for position, token in enumerate(tokens):
+                positions.setdefault(token, []).append(position)
+            for token, token_positions in positions.items():
+                self._postings.setdefault(token, {})[doc_id] = token_positions
+            self._doc_terms[doc_id] = set(positions)
+            self._gaps[doc_id] = {p: gap for p, gap in enumerate(gaps) if p and gap != ' '}
+            glued = [p for p, gap in enumerate(gaps) if gap == '']
+            self._word_before[doc_id] = {p for p in glued if is_word(tokens[p - 1])}
+            self._word_after[doc_id] = {p - 1 for p in glued if is_word(tokens[p])}
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._gaps.pop(doc_id, None)
+            self._word_before.pop(doc_id, None)
+            self._word_after.pop(doc_id, None)
+            for token in self._doc_terms.pop(doc_id, ()):
+                postings = self._postings.get(token)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[token]
+
+    def _matching_terms(self, token, position, last, partial):
+        """
+        Vocabulary terms that can stand in for one keyword token. With partial
+        matching, the first keyword token may be the end of a word and the last
+        one the start of a word (a lone token may sit anywhere inside a word).
+        """
+        if not partial or not is_word(token):
+            return [token] if token in self._postings else []
+        if position == 0 and last:
+            return [term for term in self._postings if token in term]
+        if position == 0:
+            return [term for term in self._postings if term.endswith(token)]
+        if last:
+            return [term for term in self._postings if term.startswith(token)]
+        return [token] if token in self._postings else []
+
+    def _fits(self, doc_id, start, keyword_gaps, edges):
+        """
+        Whether the keyword's tokens found at `start` are separated by exactly the
+        keyword's whitespace and, for word-boundary matching, have the \\b edges of a
+        keyword starting or ending with punctuation.
+        """
+        gaps = self._gaps[doc_id]
+        for offset in range(1, len(keyword_gaps)):
+            if gaps.get(start + offset, ' ') != keyword_gaps[offset]:
+                return False
+        first_edge, last_edge = edges
+        if first_edge and start not in self._word_before[doc_id]:
+            return False
+        if last_edge and start + len(keyword_gaps) - 1 not in self._word_after[doc_id]:
+            return False
+        return True
+
+    def docs_matching(self, keyword, partial=False, doc_ids=None):
+        """
+        Returns the set of doc ids in which the keyword's token sequence occurs.
+        """
+        tokens, keyword_gaps = tokenize_gaps(keyword)
+        if not tokens:
+            return set()
+        # Word-boundary matching: punctuation at either end of the keyword needs a word
+        # character right next to it, as \\b does.
+        edges = (False, False) if partial else (not is_word(tokens[0]), not is_word(tokens[-1]))
+        with self._lock:
+            slots = []
+            for i, token in enumerate(tokens):
+                terms = self._matching_terms(token, i, i == len(tokens) - 1, partial)
+                if not terms:
+                    return set()
+                slots.append(terms)
+
+            # Per slot: doc_id -> positions of any term allowed in that slot.
+            slot_positions = []
+            for terms in slots:
+                merged = {}
+                for term in terms:
+                    for doc_id, positions in self._postings[term].items():
+                        if doc_ids is None or doc_id in doc_ids:
+                            merged.setdefault(doc_id, set()).update(positions)
+                slot_positions.append(merged)
+
+            candidates = set(slot_positions[0])
+            for merged in slot_positions[1:]:
+                candidates &= set(merged)
+            if len(tokens) == 1 and not any(edges):
+                return candidates
+            matches = set()
+            for doc_id in candidates:
+                for start in slot_positions[0][doc_id]:
+                    if (all(start + offset in slot_positions[offset][doc_id] for offset in range(1, len(tokens)))
+                            and self._fits(doc_id, start, keyword_gaps, edges)):
+                        matches.add(doc_id)
+                        break
+            return matches
+
+    def match(self, scorer, doc_ids):
+        """
+        Evaluates a ResumeScorer's terms against the index.
+
+        Returns:
+            dict: doc_id -> (found substring terms, found bonus keywords), the same
+            shape as ResumeScorer.match() returns for raw text.
+        """
+        doc_ids = set(doc_id for doc_id in doc_ids if doc_id in self)
+        found = {doc_id: (set(), set()) for doc_id in doc_ids}
+        for term in scorer.substring_terms:
+            for doc_id in self.docs_matching(term, partial=True, doc_ids=doc_ids):
+                found[doc_id][0].add(term)
+        for term in scorer.bonus_terms:
+            for doc_id in self.docs_matching(term, partial=False, doc_ids=doc_ids):
+                found[doc_id][1].add(term)
+        return found
+
+    def score(self, scorer, doc_ids, semantic=None):
+        """
+        Scores the given documents with a ResumeScorer using only the index.
+        `semantic` optionally maps doc_id -> semantic points (see ResumeScorer.score_hits).
+
+        Returns:
+            dict: doc_id -> (final_score, breakdown)
+        """
+        return {
+            doc_id: scorer.score_hits(scorer.hits(found_terms, found_bonus),
+                                      semantic.get(doc_id) if semantic is not None else None)
+            for doc_id, (found_terms, found_bonus) in self.match(scorer, doc_ids).items()
+        }
@@ -0,0 +1,272 @@
+import re
+from functools import lru_cache
+
+# Optional C Aho-Corasick automaton (pip install pyahocorasick). Without it the
+# substring matcher falls back to per-keyword `in` scans, which are fast for short lists.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+DEFAULT_BONUS_KEYWORDS = {
+    'aws certified': 1.0,
+    'cisco certified': 1.0,
+    'pmp': 1.0,
+    'google': 0.5,
+    'microsoft': 0.5,
+    'oracle': 0.5,
+    'ibm': 0.5,
+    'certified': 0.3,
+    'scrum': 0.3,
+}
+ATS_KEYWORDS = ["experience", "education", "skills", "certification", "projects", "summary", "objective", "profile"]
+
+# Order of the criteria arguments accepted by compute_score_robust/get_scorer.
+CRITERIA_KEYS = ('job_title', 'required_skills', 'required_languages', 'min_skills', 'min_languages',
+                 'enable_ats', 'enable_bonus', 'extra_bonus_keywords', 'extra_universities')
+
+def split_terms(value):
+    """
+    Splits a comma-separated form value into lowercase, stripped terms.
+    """
+    return [s.strip().lower() for s in (value or '').split(',') if s.strip()]
+
+class SubstringMatcher:
+    """
+    Finds which of a fixed set of keywords occur anywhere in a text (plain substring
+    semantics, like `keyword in text`). Uses a single Aho-Corasick pass when available.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(k for k in keywords if k))
+        self._automaton = None
+        if ahocorasick is not None and self.keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find(self, text):
+        if self._automaton is None:
+            return {k for k in self.keywords if k in text}
+        found = set()
+        for _, keyword in self._automaton.iter(text):
+            found.add(keyword)
+            if len(found) == len(self.keywords):
+                break
+        return found
+
+class WordMatcher:
+    """
+    Finds which keywords occur delimited by word boundaries (the semantics of
+    re.search(r'\\b' + re.escape(keyword) + r'\\b', text)) in one regex pass.
+
+    The combined pattern is a lookahead alternation ordered longest-first, so at each
+    position it reports the longest keyword; shorter keywords that are a prefix of it
+    (ending on a word boundary) are implied by that match.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted(set(k for k in keywords if k), key=len, reverse=True)
+        self._pattern = None
+        self._implied = {}
+        if self.keywords:
+            alternation = '|'.join(re.escape(k) for k in self.keywords)
+            self._pattern = re.compile(r'(?=\b(' + alternation + r')\b)')
+            for keyword in self.keywords:
+                self._implied[keyword] = [keyword] + [
+                    other for other in self.keywords
+                    if len(other) < len(keyword) and re.match(re.escape(other) + r'\b', keyword)
+                ]
+
+    def find(self, text):
+        found = set()
+        if self._pattern is None:
+            return found
+        for match in self._pattern.finditer(text):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.update(self._implied[keyword])
+                if len(found) == len(self.keywords):
+                    break
+        return found
+
+class ResumeScorer:
+    """
+    The compute_score_robust criteria compiled once per job.
+
+    All substring criteria (skills, languages, job title and its words, ATS keywords)
+    share one SubstringMatcher and the bonus keywords share one WordMatcher, so each
+    resume is scanned once per matcher regardless of how many keywords the job has.
+    """
+
+    def __init__(self, job_title, required_skills, required_languages,
+                 min_skills, min_languages, enable_ats, enable_bonus,
+                 extra_bonus_keywords, extra_universities):
+        self.required_skills = split_terms(required_skills)
+        self.languages = split_terms(required_languages) if required_languages else []
+        self.has_languages = bool(required_languages)
+        self.min_skills = int(min_skills) if min_skills and str(min_skills).isdigit() and int(min_skills) > 0 else None
+        self.min_languages = int(min_languages) if min_languages and str(min_languages).isdigit() and int(min_languages) > 0 else None
+        self.job_title = job_title.lower().strip() if job_title else ''
+        # A whitespace-only title strips to '', which occurs in every text (full point).
+        self.blank_job_title = bool(job_title) and not self.job_title
+        self.job_title_words = self.job_title.split()
+        self.enable_ats = str(enable_ats).strip().lower() == "yes"
+        self.enable_bonus = str(enable_bonus).strip().lower() == "yes"
+
+        self.bonus_keywords = {}
+        if self.enable_bonus:
+            self.bonus_keywords = dict(DEFAULT_BONUS_KEYWORDS)
+            for kw in split_terms(extra_bonus_keywords):
+                self.bonus_keywords[kw] = 0.5
+            for uni in split_terms(extra_universities):
+                self.bonus_keywords[uni] = 0.5
+
+        self.substring_terms = set(self.required_skills) | set(self.languages) | set(self.job_title_words)
+        if self.job_title:
+            self.substring_terms.add(self.job_title)
+        if self.enable_ats:
+            self.substring_terms.update(ATS_KEYWORDS)
+        self.bonus_terms = set(self.bonus_keywords)
+        self._substring_matcher = SubstringMatcher(self.substring_terms)
+        self._bonus_matcher = WordMatcher(self.bonus_terms)
+
+    def match(self, resume_text):
+        """
+        Scans the resume once per matcher.
+
+        Returns:
+            tuple: (found substring terms, found bonus keywords) as sets.
+        """
+        base_text = str(resume_text).lower() if resume_text else ""
+        return self._substring_matcher.find(base_text), self._bonus_matcher.find(base_text)
+
+    def hits(self, found_terms, found_bonus):
+        """
+        Groups matched terms by score component.
+        """
+        return {
+            "required_skills": [s for s in self.required_skills if s in found_terms],
+            "job_title": bool(self.job_title) and self.job_title in found_terms,
+            "job_title_words": [w for w in self.job_title_words if w in found_terms],
+            "languages": [lang for lang in self.languages if lang in found_terms],
+            "bonus": [kw for kw in self.bonus_keywords if kw in found_bonus],
+            "ats": [w for w in ATS_KEYWORDS if w in found_terms] if self.enable_ats else [],
+        }
+
+    def score_hits(self, hits, semantic=None):
+        """
+        Turns component hits into (final_score, breakdown) with the same rules as
+        compute_score_robust. `semantic` (0-1 points, see semantic.SemanticIndex.points)
+        adds an optional fifth component; the total is then out of 11.
+        """
+        # --- Component 1: Skills + Job Requirement Matching (Max = 5) ---
+        skills_score = 0
+        if self.required_skills:
+            matched_skills = len(hits["required_skills"])
+            if self.min_skills:
+                skills_score = 4 if matched_skills >= self.min_skills else (matched_skills / self.min_skills) * 4
+            else:
+                skills_score = (matched_skills / len(self.required_skills)) * 4
+            skills_score = min(skills_score, 4)
+
+        job_title_score = 0
+        if self.blank_job_title:
+            job_title_score = 1
+        elif self.job_title:
+            if hits["job_title"]:
+                job_title_score = 1
+            elif self.job_title_words:
+                job_title_score = min(len(hits["job_title_words"]) / len(self.job_title_words), 1)
+
+        component1_score = skills_score + job_title_score
+
+        # --- Component 2: Languages Matching (Max = 1) ---
+        if self.has_languages and self.languages:
+            matched_languages = len(hits["languages"])
+            if self.min_languages:
+                language_score = 1 if matched_languages >= self.min_languages else (matched_languages / self.min_languages)
+            else:
+                language_score = matched_languages / len(self.languages)
+        else:
+            language_score = 1
+
+        # --- Component 3: Bonus Keywords (Max = 3) ---
+        if self.enable_bonus:
+            bonus_score = min(sum((self.bonus_keywords[kw] for kw in hits["bonus"]), 0.0), 2)
+        else:
+            bonus_score = 2
+
+        # --- Component 4: ATS Compatibility (Max = 2) ---
+        if self.enable_ats:
+            ats_score = min((len(hits["ats"]) / len(ATS_KEYWORDS)) * 2, 2)
+        else:
+            ats_score = 2
+
+        raw_total = component1_score + language_score + bonus_score + ats_score
+        total_max = 10
+
+        # --- Component 5 (optional): Semantic Similarity (Max = 1) ---
+        if semantic is not None:
+            raw_total += semantic
+            total_max = 11
+
+        final_score = (raw_total / total_max) * 10 if total_max > 0 else 0
+
+        breakdown = {
+            "required_skills": round(skills_score, 2),
+            "job_title": round(job_title_score, 2),
+            "skills_job": round(component1_score, 2),
+            "languages": round(language_score, 2),
+            "bonus": round(bonus_score, 2),
+            "ats": round(ats_score, 2),
+            "raw_total": round(raw_total, 2),
+            "total_max": total_max
+        }
+        if semantic is not None:
+            breakdown["semantic"] = round(semantic, 2)
+        return round(final_score, 2), breakdown
+
+    def score(self, resume_text, semantic=None):
+        """
+        Scores one resume. Returns (final_score, breakdown).
+        """
+        return self.score_hits(self.hits(*self.match(resume_text)), semantic)
+
+@lru_cache(maxsize=64)
+def get_scorer(job_title, required_skills, required_languages, min_skills, min_languages,
+               enable_ats, enable_bonus, extra_bonus_keywords, extra_universities):
+    """
+    Returns the compiled ResumeScorer for a set of criteria, reused across resumes.
+    """
+    return ResumeScorer(job_title, required_skills, required_languages, min_skills, min_languages,
+                        enable_ats, enable_bonus, extra_bonus_keywords, extra_universities)
+
+def compute_score_robust(resume_text, job_title, required_skills, required_languages,
+                         min_skills, min_languages, enable_ats, enable_bonus,
+                         extra_bonus_keywords, extra_universities):
+    """
+    Computes a robust resume score with a detailed breakdown.
+
+    Components:
+      1. Skills + Job Requirement Matching (max = 5 points):
+         - Required Skills Matching (max = 4 points; uses min_skills as threshold if provided)
+         - Job Title Matching (max = 1 point)
+      2. Languages Matching (max = 1 point):
+         - If no language requirements are provided, award full points.
+      3. Bonus Keywords (max = 3 points):
+         - If bonus evaluation is not enabled, award full points.
+      4. ATS Compatibility (max = 2 points):
+         - If ATS evaluation is not enabled, award full points.
+
+    The criteria are compiled into a cached ResumeScorer, so scoring a batch
+    against the same job only builds the keyword matchers once.
+
+    Returns:
+        tuple: (final_score, breakdown)
+    """
+    scorer = get_scorer(job_title, required_skills, required_languages, min_skills, min_languages,
+                        enable_ats, enable_bonus, extra_bonus_keywords, extra_universities)
+    return scorer.score(resume_text)
@@ -0,0 +1,242 @@
+"""
+Headless batch screening: scores every resume in a directory (walked recursively)
+or a ZIP archive against one set of criteria, without the web app.
+
+Text extraction runs in a pool of worker processes and entity extraction through
+nlp.pipe (see pipeline.iter_ingest), a chunk of resumes at a time so memory stays
+bounded. One JSON line per resume is written (and flushed) as soon as it is scored,
+and a ranked top-N is printed at the end:
+
+    python screen.py ats_export/ --job-title "Data Engineer" --skills "python, sql, spark" \
+        --min-skills 2 --enable-ats --output results.jsonl --top 20
+
+The output file doubles as the checkpoint: after an interruption, rerun the same
+command with --resume to skip the resumes already written to it.
+
+ZIP inputs are trusted operator exports, so the archive-wide member and size caps
+used for uploads are lifted; the per-file size and compression-ratio guards still apply.
+"""
+import os
+import sys
+import json
+import heapq
+import argparse
+import zipfile
+from itertools import islice
+
+from file_parser import SUPPORTED_EXTENSIONS, iter_zip_resumes
+from pipeline import iter_ingest, extraction_pool, EXTRACT_WORKERS, NLP_BATCH_SIZE, NLP_N_PROCESS
+from scoring import compute_score_robust
+
+# Resumes handed to the ingestion pipeline at a time; bounds the memory held for
+# file bytes (ZIP input), texts and docs.
+CHUNK_SIZE = int(os.environ.get('RESUME_SCREEN_CHUNK_SIZE', 256))
+
+def iter_directory(directory, skip=None):
+    """
+    Yields {'name', 'path'} items for the supported resumes under `directory`, in a
+    stable order. Names are paths relative to `directory`; those `skip(name)`
+    accepts are left out.
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, directory)
+                if skip is None or not skip(name):
+                    yield {'name': name, 'path': path}
+
+def iter_zip(path, skip=None):
+    """
+    Yields {'name', 'data'} items (or {'name', 'error'} for members that cannot be
+    read) for the supported resumes in a ZIP archive, decompressing one at a time.
+    Members `skip(name)` accepts are not decompressed at all.
+    """
+    for name, data, error in iter_zip_resumes(path, max_members=float('inf'), max_total_bytes=float('inf'),
+                                              skip=skip):
+        yield {'name': name, 'error': error} if error else {'name': name, 'data': data}
+
+def iter_inputs(source, skip=None):
+    if os.path.isdir(source):
+        return iter_directory(source, skip)
+    if zipfile.is_zipfile(source):
+        return iter_zip(source, skip)
+    raise ValueError(f"{source} is neither a directory nor a ZIP archive")
+
+def load_checkpoint(path):
+    """
+    Reads the results already written to `path` by an interrupted run.
+
+    A line cut short by the interruption is dropped (and truncated from the file) so
+    appending continues on a clean line boundary.
+
+    Returns:
+        list: the result records, in file order.
+    """
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, 'rb+') as f:
+        valid = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            valid += len(line)
+        f.truncate(valid)
+    return records
+
+def result_record(record, criteria):
+    """
+    Scores one ingested resume and returns its output line as a dict.
+    """
+    if record['error']:
+        return {'file': record['name'], 'error': record['error'],
+                'extract_seconds': round(record.get('extract_seconds', 0.0), 3)}
+    analysis = record['analysis']
+    score, breakdown = compute_score_robust(record['text'], **criteria)
+    return {
+        'file': record['name'],
+        'candidate_name': analysis['candidate_name'],
+        'name_tier': analysis.get('name_tier'),
+        'emails': analysis['validation'].get('emails', []),
+        'score': score,
+        'score_breakdown': breakdown,
+        'validation': analysis['validation'],
+        'extract_seconds': round(record['extract_seconds'], 3),
+    }
+
+def screen(items, criteria, chunk_size=CHUNK_SIZE, max_workers=None, batch_size=None, n_process=None):
+    """
+    Ingests and scores resumes chunk by chunk, all chunks extracted in one process pool.
+
+    Args:
+        items (iterable): {'name', 'path' | 'data' | 'error'} dicts, consumed lazily.
+        criteria (dict): compute_score_robust keyword arguments.
+
+    Yields:
+        dict: one result record per resume, in input order.
+    """
+    items = iter(items)
+    with extraction_pool(max_workers) as pool:
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                return
+            records = iter_ingest([item for item in chunk if not item.get('error')], batch_size=batch_size,
+                                  n_process=n_process, max_workers=max_workers, pool=pool)
+            for item in chunk:
+                record = dict(item, extract_seconds=0.0) if item.get('error') else next(records)
+                yield result_record(record, criteria)
+
+class TopN:
+    """
+    Keeps the N highest-scoring results seen so far (ties keep the earlier result).
+    """
+
+    def __init__(self, n):
+        self.n = n
+        self._heap = []    # (score, -sequence, entry); the root is the weakest kept
+        self._seen = 0
+
+    def add(self, record):
+        if self.n <= 0 or 'score' not in record:
+            return
+        self._seen += 1
+        entry = (record['score'], -self._seen,
+                 {key: record.get(key) for key in ('file', 'candidate_name', 'score', 'emails')})
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranked(self):
+        return [entry for _, _, entry in sorted(self._heap, reverse=True)]
+
+def print_summary(top, counts, out=sys.stderr):
+    print(f"\nScreened {counts['total']} resumes ({counts['resumed']} from the checkpoint, "
+          f"{counts['errors']} errors)", file=out)
+    ranked = top.ranked()
+    if not ranked:
+        return
+    print(f"\nTop {len(ranked)}:", file=out)
+    print(f"{'rank':>4}  {'score':>5}  {'candidate':<28} file", file=out)
+    for rank, entry in enumerate(ranked, 1):
+        print(f"{rank:>4}  {entry['score']:>5.2f}  {(entry['candidate_name'] or '-')[:28]:<28} {entry['file']}",
+              file=out)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Screen a directory or ZIP of resumes against job criteria.")
+    parser.add_argument('source', help="directory of resumes (walked recursively) or a ZIP archive")
+    parser.add_argument('--job-title', default='', help="job title to match")
+    parser.add_argument('--skills', default='', help="comma-separated required skills")
+    parser.add_argument('--languages', default='', help="comma-separated required languages")
+    parser.add_argument('--min-skills', default='', help="skills needed for the full skills score")
+    parser.add_argument('--min-languages', default='', help="languages needed for the full language score")
+    parser.add_argument('--enable-ats', action='store_true', help="score ATS keywords")
+    parser.add_argument('--enable-bonus', action='store_true', help="score bonus keywords")
+    parser.add_argument('--bonus-keywords', default='', help="extra bonus keywords, comma-separated")
+    parser.add_argument('--universities', default='', help="extra universities, comma-separated")
+    parser.add_argument('--output', '-o', default='-', help="JSONL output file (default: stdout)")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip resumes already in --output and append to it")
+    parser.add_argument('--top', type=int, default=10, help="print the N best candidates at the end (0: none)")
+    parser.add_argument('--workers', type=int, default=EXTRACT_WORKERS, help="text extraction processes")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="resumes ingested at a time")
+    parser.add_argument('--batch-size', type=int, default=NLP_BATCH_SIZE, help="spaCy nlp.pipe batch size")
+    parser.add_argument('--n-process', type=int, default=NLP_N_PROCESS, help="spaCy nlp.pipe processes")
+    args = parser.parse_args(argv)
+    if args.resume and args.output == '-':
+        parser.error("--resume needs an --output file")
+
+    criteria = {
+        'job_title': args.job_title,
+        'required_skills': args.skills,
+        'required_languages': args.languages,
+        'min_skills': args.min_skills,
+        'min_languages': args.min_languages,
+        'enable_ats': 'yes' if args.enable_ats else 'no',
+        'enable_bonus': 'yes' if args.enable_bonus else 'no',
+        'extra_bonus_keywords': args.bonus_keywords,
+        'extra_universities': args.universities,
+    }
+    top = TopN(args.top)
+    counts = {'total': 0, 'resumed': 0, 'errors': 0}
+    done = set()
+    if args.resume:
+        for record in load_checkpoint(args.output):
+            done.add(record['file'])
+            top.add(record)
+            counts['resumed'] += 1
+            counts['errors'] += 'error' in record
+        counts['total'] = counts['resumed']
+    try:
+        # Resumes already in the checkpoint are skipped before they are read.
+        items = iter_inputs(args.source, skip=done.__contains__ if done else None)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'a' if args.resume else 'w', encoding='utf-8')
+    try:
+        for record in screen(items, criteria, chunk_size=max(args.chunk_size, 1), max_workers=args.workers,
+                             batch_size=args.batch_size, n_process=args.n_process):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            top.add(record)
+            counts['total'] += 1
+            counts['errors'] += 'error' in record
+    except KeyboardInterrupt:
+        print(f"\nInterrupted after {counts['total']} resumes; rerun with --resume to continue.", file=sys.stderr)
+        return 130
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print_summary(top, counts)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
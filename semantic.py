@@ -0,0 +1,231 @@
+import os
+import logging
+import threading
+from functools import lru_cache
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Optional HNSW approximate nearest-neighbour index (pip install hnswlib) for very large
+# pools. Without it the exact index scores the whole pool with one matrix-vector product.
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# Semantic matching.
+SEMANTIC_SCORING = os.environ.get('RESUME_SEMANTIC', 'no').strip().lower() in ('yes', '1', 'true')
+VECTOR_INDEX = os.environ.get('RESUME_VECTOR_INDEX', 'exact')   # "exact" or "hnsw"
+# Cosine similarities at or below the floor score 0 points, 1.0 scores the full point;
+# averaged word vectors of any two English texts are rarely far below 0.5.
+SEMANTIC_FLOOR = float(os.environ.get('RESUME_SEMANTIC_FLOOR', 0.5))
+INDEX_CAPACITY = 1024
+
+def content_words(tokens):
+    return [t for t in tokens if not (t.is_stop or t.is_punct or t.is_space)]
+
+def tokens_vector(table, tokens):
+    """
+    Mean vector of the tokens' rows in a spaCy Vectors table, L2-normalized. Words
+    are looked up by their lowercased norm in one batched table lookup; a zero
+    vector is returned when none of them has a vector.
+    """
+    rows = table.find(keys=[t.norm for t in tokens])
+    rows = rows[rows >= 0]
+    if not len(rows):
+        return np.zeros(table.shape[1], dtype=np.float32)
+    vector = np.asarray(table.data[rows], dtype=np.float32).mean(axis=0)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def text_vector(nlp, text):
+    """
+    Vector of the text's content words, using the static vectors of the loaded
+    spaCy model (tokenizer only, no pipeline components run).
+    Returns None when the model has no vectors (e.g. en_core_web_trf).
+    """
+    table = nlp.vocab.vectors
+    if not table.shape[1]:
+        return None
+    return tokens_vector(table, content_words(nlp.make_doc(text or "")))
+
+class ExactIndex:
+    """
+    Document vectors in one contiguous float32 matrix (rows normalized), grown by
+    doubling. Cosine similarity against every document is one matrix-vector product.
+    """
+
+    def __init__(self, capacity=INDEX_CAPACITY):
+        self.capacity = capacity
+        self._matrix = None
+        self._ids = []       # row -> doc_id
+        self._rows = {}      # doc_id -> row
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._rows
+
+    def add(self, doc_id, vector):
+        with self._lock:
+            if doc_id in self._rows:
+                self._matrix[self._rows[doc_id]] = vector
+                return
+            if self._matrix is None:
+                self._matrix = np.zeros((self.capacity, len(vector)), dtype=np.float32)
+            elif len(self._ids) == len(self._matrix):
+                grown = np.zeros((2 * len(self._matrix), self._matrix.shape[1]), dtype=np.float32)
+                grown[:len(self._matrix)] = self._matrix
+                self._matrix = grown
+            row = len(self._ids)
+            self._matrix[row] = vector
+            self._ids.append(doc_id)
+            self._rows[doc_id] = row
+
+    def remove(self, doc_id):
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                return
+            # Move the last row into the gap to keep the matrix contiguous.
+            last = len(self._ids) - 1
+            if row != last:
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = self._ids[last]
+                self._rows[self._ids[row]] = row
+            self._matrix[last] = 0
+            self._ids.pop()
+
+    def similarities(self, vector, doc_ids):
+        """
+        Returns {doc_id: cosine similarity} for the indexed doc_ids.
+        """
+        with self._lock:
+            pairs = [(doc_id, self._rows[doc_id]) for doc_id in doc_ids if doc_id in self._rows]
+            if not pairs:
+                return {}
+            sims = self._matrix[[row for _, row in pairs]] @ vector
+        return {doc_id: float(sim) for (doc_id, _), sim in zip(pairs, sims)}
+
+    def search(self, vector, k=10):
+        """
+        Returns the k most similar documents as (doc_id, similarity), best first.
+        """
+        with self._lock:
+            count = len(self._ids)
+            if not count:
+                return []
+            sims = self._matrix[:count] @ vector
+            ids = list(self._ids)
+        k = min(k, count)
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind='stable')]
+        return [(ids[i], float(sims[i])) for i in top]
+
+class HNSWIndex(ExactIndex):
+    """
+    Exact index plus an hnswlib graph answering whole-pool top-k searches in
+    sub-linear time. Per-batch similarities still come from the exact matrix.
+    """
+
+    def __init__(self, capacity=INDEX_CAPACITY, ef=100, m=16):
+        if hnswlib is None:
+            raise ImportError("RESUME_VECTOR_INDEX=hnsw requires hnswlib (pip install hnswlib)")
+        super().__init__(capacity)
+        self.ef = ef
+        self.m = m
+        self._graph = None
+        self._labels = {}     # doc_id -> graph label
+        self._doc_ids = {}    # graph label -> doc_id
+        self._next_label = 0
+
+    def add(self, doc_id, vector):
+        with self._lock:
+            super().add(doc_id, vector)
+            if self._graph is None:
+                self._graph = hnswlib.Index(space='cosine', dim=len(vector))
+                self._graph.init_index(max_elements=self.capacity, ef_construction=200, M=self.m)
+                self._graph.set_ef(self.ef)
+            if doc_id in self._labels:
+                self._graph.mark_deleted(self._labels.pop(doc_id))
+            if self._graph.get_current_count() >= self._graph.get_max_elements():
+                self._graph.resize_index(2 * self._graph.get_max_elements())
+            label = self._next_label
+            self._next_label += 1
+            self._graph.add_items(vector.reshape(1, -1), np.array([label]))
+            self._labels[doc_id] = label
+            self._doc_ids[label] = doc_id
+
+    def remove(self, doc_id):
+        with self._lock:
+            super().remove(doc_id)
+            label = self._labels.pop(doc_id, None)
+            if label is not None:
+                self._graph.mark_deleted(label)
+                del self._doc_ids[label]
+
+    def search(self, vector, k=10):
+        with self._lock:
+            if not self._labels:
+                return []
+            labels, distances = self._graph.knn_query(vector.reshape(1, -1), k=min(k, len(self._labels)))
+        return [(self._doc_ids[int(label)], 1.0 - float(distance)) for label, distance in zip(labels[0], distances[0])]
+
+# Available vector index implementations; register others here.
+INDEX_BACKENDS = {'exact': ExactIndex, 'hnsw': HNSWIndex}
+
+class SemanticIndex:
+    """
+    Resume vectors computed once at ingest, for semantic job-to-resume matching.
+
+    Job queries are embedded the same way (and memoized), so scoring a batch costs
+    one vector lookup per resume and ranking the pool one product over the matrix.
+    """
+
+    def __init__(self, get_nlp, backend=VECTOR_INDEX, floor=SEMANTIC_FLOOR):
+        self.get_nlp = get_nlp
+        self.floor = floor
+        self.index = INDEX_BACKENDS[backend]()
+        self.query_vector = lru_cache(maxsize=256)(self._embed)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.index
+
+    def _embed(self, text):
+        return text_vector(self.get_nlp(), text)
+
+    def add(self, doc_id, text):
+        vector = self._embed(text)
+        if vector is not None:
+            self.index.add(doc_id, vector)
+
+    def remove(self, doc_id):
+        self.index.remove(doc_id)
+
+    def similarities(self, query, doc_ids):
+        vector = self.query_vector(query)
+        if vector is None:
+            return {}
+        return self.index.similarities(vector, doc_ids)
+
+    def points(self, query, doc_ids):
+        """
+        Semantic score component per document: the cosine similarity rescaled from
+        [floor, 1] to [0, 1] points.
+        """
+        return {doc_id: min(max((sim - self.floor) / (1 - self.floor), 0.0), 1.0)
+                for doc_id, sim in self.similarities(query, doc_ids).items()}
+
+    def search(self, query, k=10):
+        vector = self.query_vector(query)
+        if vector is None:
+            return []
+        return self.index.search(vector, k)
+
+def job_query(criteria):
+    """
+    The text a job profile is embedded from: title, skills and languages.
+    """
+    return " ".join(criteria.get(key) or '' for key in ('job_title', 'required_skills', 'required_languages')).strip()
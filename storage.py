@@ -0,0 +1,475 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict, Counter
+from collections.abc import MutableMapping
+from metrics import cache_lookup
+
+# Storage configuration.
+STORE_BACKEND = os.environ.get('RESUME_STORE_BACKEND', 'sqlite')
+STORE_DIR = os.environ.get('RESUME_STORE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+STORE_CACHE_SIZE = int(os.environ.get('RESUME_STORE_CACHE_SIZE', 256))
+STORE_TTL = float(os.environ.get('RESUME_STORE_TTL', 7 * 24 * 3600))  # seconds; 0 disables eviction
+EVICTION_INTERVAL = 60  # seconds between lazy TTL sweeps
+
+# Kinds of data kept per summary_id. File blobs bypass the LRU cache (they are read from disk).
+KINDS = ('file', 'text', 'summary')
+CACHED_KINDS = ('text', 'summary')
+
+class MemoryBackend:
+    """
+    Process-local backend (the old module-level dicts). Useful for development and tests.
+    """
+
+    def __init__(self):
+        self._data = {kind: {} for kind in KINDS}
+        self._created = {}
+        self._stats = {}              # key -> per-resume counter contributions
+        self._counters = Counter()    # running totals of all recorded stats
+        self._results = {}            # job_id -> (created_at, payload)
+        self._content = {}            # content hash -> (created_at, payload)
+        self._text_hashes = {}        # normalized text hash -> (created_at, first upload)
+        self._lock = threading.Lock()
+
+    def get(self, kind, key):
+        with self._lock:
+            return self._data[kind].get(key)
+
+    def put(self, kind, key, value):
+        with self._lock:
+            self._data[kind][key] = value
+            self._created.setdefault(key, time.time())
+
+    def delete(self, key):
+        with self._lock:
+            for kind in KINDS:
+                self._data[kind].pop(key, None)
+            self._created.pop(key, None)
+            self._stats.pop(key, None)
+
+    def keys(self, kind):
+        with self._lock:
+            return list(self._data[kind])
+
+    def file_info(self, key):
+        entry = self.get('file', key)
+        return {'type': entry['type'], 'data': entry['data'], 'path': None} if entry else None
+
+    def record_stats(self, key, stats):
+        with self._lock:
+            if key not in self._created or key in self._stats:
+                return False
+            self._stats[key] = dict(stats)
+            self._counters.update(stats)
+            return True
+
+    def discard_stats(self, key):
+        with self._lock:
+            stats = self._stats.pop(key, None)
+            if stats:
+                self._counters.subtract(stats)
+            return stats
+
+    def counters(self):
+        with self._lock:
+            return dict(self._counters)
+
+    def keys_without_stats(self):
+        with self._lock:
+            return [key for key in self._data['text'] if key not in self._stats]
+
+    def put_results(self, job_id, payload):
+        with self._lock:
+            self._results[job_id] = (time.time(), payload)
+
+    def get_results(self, job_id):
+        with self._lock:
+            entry = self._results.get(job_id)
+            return entry[1] if entry else None
+
+    def delete_results_before(self, cutoff):
+        with self._lock:
+            for table in (self._results, self._content, self._text_hashes):
+                for key in [k for k, (created, _) in table.items() if created < cutoff]:
+                    del table[key]
+
+    def get_content(self, content_hash):
+        with self._lock:
+            entry = self._content.get(content_hash)
+            return entry[1] if entry else None
+
+    def put_content(self, content_hash, payload):
+        with self._lock:
+            self._content[content_hash] = (time.time(), payload)
+
+    def claim_text_hash(self, text_hash, first):
+        with self._lock:
+            entry = self._text_hashes.setdefault(text_hash, (time.time(), first))
+            return entry[1]
+
+    def expired(self, cutoff):
+        with self._lock:
+            return [key for key, created in self._created.items() if created < cutoff]
+
+class SQLiteBackend:
+    """
+    SQLite metadata/text store with PDF blobs written to files on disk.
+    The database file is shared by every worker process pointing at the same directory.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, 'blobs')
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.db_path = os.path.join(directory, 'resume_store.sqlite3')
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS resumes ('
+                ' summary_id TEXT PRIMARY KEY,'
+                ' created_at REAL NOT NULL,'
+                ' text TEXT,'
+                ' summary TEXT,'
+                ' file_type TEXT,'
+                ' file_path TEXT)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS resumes_created_at ON resumes (created_at)')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(resumes)')}
+            if 'stats' not in columns:
+                conn.execute('ALTER TABLE resumes ADD COLUMN stats TEXT')
+            conn.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS job_results ('
+                ' job_id TEXT PRIMARY KEY,'
+                ' created_at REAL NOT NULL,'
+                ' payload TEXT NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS content_cache ('
+                ' content_hash TEXT PRIMARY KEY,'
+                ' created_at REAL NOT NULL,'
+                ' payload TEXT NOT NULL)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS text_hashes ('
+                ' text_hash TEXT PRIMARY KEY,'
+                ' created_at REAL NOT NULL,'
+                ' first TEXT NOT NULL)'
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def blob_path(self, key):
+        return os.path.join(self.blob_dir, f"{key}.bin")
+
+    def file_info(self, key):
+        row = self._connect().execute('SELECT file_type, file_path FROM resumes WHERE summary_id = ?', (key,)).fetchone()
+        if not row or not row[1] or not os.path.exists(row[1]):
+            return None
+        return {'type': row[0], 'data': None, 'path': row[1]}
+
+    def get(self, kind, key):
+        conn = self._connect()
+        if kind == 'file':
+            info = self.file_info(key)
+            if info is None:
+                return None
+            with open(info['path'], 'rb') as f:
+                return {'type': info['type'], 'data': f.read(), 'path': info['path']}
+        row = conn.execute(f'SELECT {kind} FROM resumes WHERE summary_id = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, kind, key, value):
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR IGNORE INTO resumes (summary_id, created_at) VALUES (?, ?)', (key, time.time()))
+            if kind == 'file':
+                path = self.blob_path(key)
+                tmp_path = path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(value['data'])
+                os.replace(tmp_path, path)
+                conn.execute('UPDATE resumes SET file_type = ?, file_path = ? WHERE summary_id = ?',
+                             (value['type'], path, key))
+            else:
+                conn.execute(f'UPDATE resumes SET {kind} = ? WHERE summary_id = ?', (value, key))
+
+    def delete(self, key):
+        conn = self._connect()
+        with conn:
+            conn.execute('DELETE FROM resumes WHERE summary_id = ?', (key,))
+        try:
+            os.remove(self.blob_path(key))
+        except FileNotFoundError:
+            pass
+
+    def keys(self, kind):
+        column = 'file_path' if kind == 'file' else kind
+        rows = self._connect().execute(f'SELECT summary_id FROM resumes WHERE {column} IS NOT NULL ORDER BY created_at')
+        return [row[0] for row in rows]
+
+    def expired(self, cutoff):
+        rows = self._connect().execute('SELECT summary_id FROM resumes WHERE created_at < ?', (cutoff,))
+        return [row[0] for row in rows]
+
+    def _add_counters(self, conn, stats, sign):
+        conn.executemany(
+            'INSERT INTO counters (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            [(name, sign * count) for name, count in stats.items()]
+        )
+
+    def record_stats(self, key, stats):
+        # The stats column acts as a guard, so concurrent workers never count a resume twice.
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute('UPDATE resumes SET stats = ? WHERE summary_id = ? AND stats IS NULL',
+                                  (json.dumps(stats), key))
+            if cursor.rowcount != 1:
+                return False
+            self._add_counters(conn, stats, 1)
+            return True
+
+    def discard_stats(self, key):
+        conn = self._connect()
+        with conn:
+            row = conn.execute('SELECT stats FROM resumes WHERE summary_id = ? AND stats IS NOT NULL', (key,)).fetchone()
+            if not row:
+                return None
+            cursor = conn.execute('UPDATE resumes SET stats = NULL WHERE summary_id = ? AND stats IS NOT NULL', (key,))
+            if cursor.rowcount != 1:
+                return None
+            stats = json.loads(row[0])
+            self._add_counters(conn, stats, -1)
+            return stats
+
+    def counters(self):
+        return {name: value for name, value in self._connect().execute('SELECT name, value FROM counters')}
+
+    def keys_without_stats(self):
+        rows = self._connect().execute('SELECT summary_id FROM resumes WHERE text IS NOT NULL AND stats IS NULL')
+        return [row[0] for row in rows]
+
+    def put_results(self, job_id, payload):
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO job_results (job_id, created_at, payload) VALUES (?, ?, ?)',
+                         (job_id, time.time(), json.dumps(payload)))
+
+    def get_results(self, job_id):
+        row = self._connect().execute('SELECT payload FROM job_results WHERE job_id = ?', (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete_results_before(self, cutoff):
+        conn = self._connect()
+        with conn:
+            for table in ('job_results', 'content_cache', 'text_hashes'):
+                conn.execute(f'DELETE FROM {table} WHERE created_at < ?', (cutoff,))
+
+    def get_content(self, content_hash):
+        row = self._connect().execute('SELECT payload FROM content_cache WHERE content_hash = ?',
+                                      (content_hash,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_content(self, content_hash, payload):
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO content_cache (content_hash, created_at, payload) VALUES (?, ?, ?)',
+                         (content_hash, time.time(), json.dumps(payload)))
+
+    def claim_text_hash(self, text_hash, first):
+        conn = self._connect()
+        with conn:
+            conn.execute('INSERT OR IGNORE INTO text_hashes (text_hash, created_at, first) VALUES (?, ?, ?)',
+                         (text_hash, time.time(), json.dumps(first)))
+            row = conn.execute('SELECT first FROM text_hashes WHERE text_hash = ?', (text_hash,)).fetchone()
+        return json.loads(row[0])
+
+class ResumeStore:
+    """
+    Resume data keyed by summary_id: a storage backend with a bounded in-memory
+    LRU cache in front and TTL-based eviction of old uploads.
+
+    Callbacks registered with on_evict(fn) are called with the summary_id of every
+    evicted upload so derived in-memory structures (like the search index) can drop it.
+    """
+
+    def __init__(self, backend, cache_size=STORE_CACHE_SIZE, ttl=STORE_TTL):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self._cache = OrderedDict()   # (kind, key) -> value
+        self._lock = threading.RLock()
+        self._evict_callbacks = []
+        self._last_sweep = 0.0
+
+    def on_evict(self, callback):
+        self._evict_callbacks.append(callback)
+
+    def _cache_put(self, kind, key, value):
+        if kind not in CACHED_KINDS:
+            return
+        with self._lock:
+            self._cache[(kind, key)] = value
+            self._cache.move_to_end((kind, key))
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, kind, key, default=None):
+        with self._lock:
+            if (kind, key) in self._cache:
+                self._cache.move_to_end((kind, key))
+                cache_lookup('store', True)
+                return self._cache[(kind, key)]
+        if kind in CACHED_KINDS:
+            cache_lookup('store', False)
+        value = self.backend.get(kind, key)
+        if value is None:
+            return default
+        self._cache_put(kind, key, value)
+        return value
+
+    def put(self, kind, key, value):
+        self.backend.put(kind, key, value)
+        self._cache_put(kind, key, value)
+        self.maybe_evict()
+
+    def delete(self, key):
+        self.backend.delete(key)
+        with self._lock:
+            for kind in KINDS:
+                self._cache.pop((kind, key), None)
+
+    def keys(self, kind):
+        return self.backend.keys(kind)
+
+    def file_info(self, key):
+        """
+        Describes a stored file without loading it when it lives on disk.
+
+        Returns:
+            dict: {'type', 'path', 'data'} where exactly one of path/data is set, or None.
+        """
+        return self.backend.file_info(key)
+
+    def evict_expired(self, now=None):
+        """
+        Deletes uploads older than the TTL. Returns the evicted summary_ids.
+        """
+        if not self.ttl:
+            return []
+        now = time.time() if now is None else now
+        evicted = self.backend.expired(now - self.ttl)
+        for key in evicted:
+            # Callbacks run first so they can still read what is about to be deleted.
+            for callback in self._evict_callbacks:
+                callback(key)
+            self.delete(key)
+        self.backend.delete_results_before(now - self.ttl)
+        return evicted
+
+    def maybe_evict(self):
+        """
+        Runs a TTL sweep at most once every EVICTION_INTERVAL seconds.
+        """
+        now = time.time()
+        if now - self._last_sweep < EVICTION_INTERVAL:
+            return
+        self._last_sweep = now
+        self.evict_expired(now)
+
+    def record_stats(self, key, stats):
+        """
+        Stores an upload's counter contributions and adds them to the running totals
+        (once per key).
+        """
+        return self.backend.record_stats(key, stats)
+
+    def discard_stats(self, key):
+        """
+        Subtracts an upload's contributions from the running totals.
+        """
+        return self.backend.discard_stats(key)
+
+    def counters(self):
+        return self.backend.counters()
+
+    def keys_without_stats(self):
+        return self.backend.keys_without_stats()
+
+    def put_results(self, job_id, payload):
+        """
+        Stores a finished job's criteria and compact ranked results (JSON-serializable).
+        """
+        self.backend.put_results(job_id, payload)
+
+    def get_results(self, job_id):
+        return self.backend.get_results(job_id)
+
+    def get_content(self, content_hash):
+        """
+        Returns the cached extraction/analysis for a file's content hash, if any.
+        """
+        return self.backend.get_content(content_hash)
+
+    def put_content(self, content_hash, payload):
+        self.backend.put_content(content_hash, payload)
+
+    def claim_text_hash(self, text_hash, first):
+        """
+        Registers `first` (a JSON-serializable description of an upload) as the first
+        upload with this normalized text, and returns whichever upload holds the claim.
+        """
+        return self.backend.claim_text_hash(text_hash, first)
+
+    def mapping(self, kind):
+        return StoreMapping(self, kind)
+
+class StoreMapping(MutableMapping):
+    """
+    Dict-style view of one kind of data in a ResumeStore, so code written against
+    the old FILE_STORE / RAW_TEXT / SUMMARY_DATA dicts keeps working.
+    """
+
+    def __init__(self, store, kind):
+        self.store = store
+        self.kind = kind
+
+    def __getitem__(self, key):
+        value = self.store.get(self.kind, key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.store.put(self.kind, key, value)
+
+    def __delitem__(self, key):
+        self.store.delete(key)
+
+    def __contains__(self, key):
+        return self.store.get(self.kind, key) is not None
+
+    def __iter__(self):
+        return iter(self.store.keys(self.kind))
+
+    def __len__(self):
+        return len(self.store.keys(self.kind))
+
+def create_store(backend=STORE_BACKEND, directory=STORE_DIR):
+    """
+    Builds the configured ResumeStore ('sqlite' by default, or 'memory').
+    """
+    if backend == 'memory':
+        return ResumeStore(MemoryBackend())
+    if backend == 'sqlite':
+        return ResumeStore(SQLiteBackend(directory))
+    raise ValueError(f"Unknown resume store backend: {backend}")
@@ -0,0 +1,345 @@
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+import numpy as np
+from nlp_utils import get_nlp
+from semantic import content_words, tokens_vector
+
+logger = logging.getLogger(__name__)
+
+# Summarization tuning.
+SUMMARY_BATCH_SIZE = int(os.environ.get('RESUME_SUMMARY_BATCH_SIZE', 8))
+SUMMARY_BATCH_WAIT = float(os.environ.get('RESUME_SUMMARY_BATCH_WAIT', 0.05))  # seconds to gather a batch
+SUMMARY_TIMEOUT = float(os.environ.get('RESUME_SUMMARY_TIMEOUT', 120))
+PRESUMMARIZE_TOP_N = int(os.environ.get('RESUME_PRESUMMARIZE_TOP_N', 0))
+SUMMARY_MAX_LENGTH = 250
+SUMMARY_MIN_LENGTH = 50
+# Fallback chunk size (in words) when the pipeline exposes no tokenizer.
+CHUNK_WORDS = 600
+
+# Summarizer backend: "textrank" (extractive sentence ranking, milliseconds, no extra
+# model) or "abstractive" (the SUMMARY_MODEL transformers pipeline, opt-in).
+SUMMARIZER = os.environ.get('RESUME_SUMMARIZER', 'textrank').strip().lower()
+SUMMARY_MODEL = "sshleifer/distilbart-cnn-12-6"
+
+# TextRank settings: PageRank damping, and the shortest sentence (in words) worth
+# extracting, which leaves out headings and list fragments.
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_MIN_WORDS = 5
+TEXTRANK_MIN_ALPHA = 0.75   # share of alphabetic words a sentence needs
+
+# Resume section headings, and how much TextRank favours sentences in each section
+# (sentences before the first heading count as 1.0).
+SECTION_HEADINGS = {
+    'summary': 'summary', 'professional summary': 'summary', 'profile': 'summary',
+    'professional profile': 'summary', 'objective': 'summary', 'career objective': 'summary',
+    'about me': 'summary',
+    'experience': 'experience', 'work experience': 'experience', 'professional experience': 'experience',
+    'employment history': 'experience', 'work history': 'experience', 'career history': 'experience',
+    'skills': 'skills', 'technical skills': 'skills', 'key skills': 'skills', 'core competencies': 'skills',
+    'education': 'education', 'certifications': 'education', 'training': 'education',
+    'languages': 'other', 'interests': 'other', 'hobbies': 'other', 'references': 'other',
+    'activities': 'other', 'volunteering': 'other',
+}
+SECTION_BOOSTS = {'summary': 2.0, 'experience': 1.5, 'skills': 1.0, 'education': 1.0, 'other': 0.5}
+
+_summarizer = None
+_summarizer_lock = threading.Lock()
+
+def get_summarizer():
+    """
+    Returns the shared summarizer selected by RESUME_SUMMARIZER, building it on first
+    use: a TextRankSummarizer over the spaCy model, or the transformers summarization
+    pipeline (make sure to install PyTorch). transformers itself is only imported here.
+    """
+    global _summarizer
+    if _summarizer is None:
+        with _summarizer_lock:
+            if _summarizer is None:
+                started = time.perf_counter()
+                if SUMMARIZER == 'abstractive':
+                    from transformers import pipeline
+                    _summarizer = pipeline("summarization", model=SUMMARY_MODEL)
+                elif SUMMARIZER == 'textrank':
+                    _summarizer = TextRankSummarizer(get_nlp)
+                else:
+                    raise ValueError(f"Unknown RESUME_SUMMARIZER {SUMMARIZER!r} (use textrank or abstractive)")
+                logger.info("Loaded %s summarizer in %.2fs", SUMMARIZER, time.perf_counter() - started)
+    return _summarizer
+
+class TextRankSummarizer:
+    """
+    Extractive summarizer: ranks a resume's sentences with TextRank and returns the
+    best ones, in document order, up to max_length words.
+
+    Sentences come from spaCy's rule-based sentencizer (also split at line breaks,
+    so bullet lines stand alone) and are compared by the cosine of their mean word
+    vectors, or of their word counts when the model has no static vectors. Scores
+    are weighted by the resume section the sentence is in (SECTION_BOOSTS).
+
+    Called like the transformers pipeline (texts in, [{'summary_text'}] out) so
+    SummaryWorker runs either backend. It reads whole resumes, so nothing is chunked.
+    """
+
+    tokenizer = None
+    chunked = False
+
+    def __init__(self, get_nlp, damping=TEXTRANK_DAMPING, min_words=TEXTRANK_MIN_WORDS):
+        self.get_nlp = get_nlp
+        self.damping = damping
+        self.min_words = min_words
+        # Imported here so importing the app does not load spaCy.
+        from spacy.pipeline import Sentencizer
+        self._sentencizer = Sentencizer()
+
+    def __call__(self, texts, max_length=SUMMARY_MAX_LENGTH, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+        return [{'summary_text': self.summarize(text, max_length)} for text in texts]
+
+    def sentences(self, text):
+        """
+        Returns (sentence span, section) pairs for the text, headings excluded.
+        """
+        doc = self._sentencizer(self.get_nlp().make_doc(text or ""))
+        pieces = []
+        for sent in doc.sents:
+            start = sent.start
+            for token in sent:
+                if token.is_space and '\n' in token.text:
+                    if token.i > start:
+                        pieces.append(doc[start:token.i])
+                    start = token.i + 1
+            if start < sent.end:
+                pieces.append(doc[start:sent.end])
+        section = None
+        sentences = []
+        for span in pieces:
+            heading = SECTION_HEADINGS.get(" ".join(span.text.lower().split()).rstrip(':').strip())
+            if heading:
+                section = heading
+            else:
+                sentences.append((span, section))
+        return sentences
+
+    def is_prose(self, span):
+        """
+        Whether a sentence is worth extracting: enough words, mostly alphabetic, and
+        no contact details (address, phone, email and URL lines are left out).
+        """
+        words = [t for t in span if not (t.is_punct or t.is_space)]
+        alpha = sum(t.is_alpha for t in words)
+        return (alpha >= self.min_words and alpha >= TEXTRANK_MIN_ALPHA * len(words)
+                and not any(t.like_email or t.like_url for t in words))
+
+    def similarity(self, spans):
+        """
+        Sentence x sentence cosine similarities (non-negative, zero diagonal).
+        """
+        words = [content_words(span) for span in spans]
+        table = self.get_nlp().vocab.vectors
+        if table.shape[1]:
+            matrix = np.array([tokens_vector(table, tokens) for tokens in words])
+        else:
+            columns = {}
+            for tokens in words:
+                for token in tokens:
+                    columns.setdefault(token.norm, len(columns))
+            matrix = np.zeros((len(words), max(len(columns), 1)), dtype=np.float32)
+            for row, tokens in enumerate(words):
+                for token in tokens:
+                    matrix[row, columns[token.norm]] += 1
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+        sim = np.clip(matrix @ matrix.T, 0, None)
+        np.fill_diagonal(sim, 0)
+        return sim
+
+    def rank(self, sim, iterations=100, tolerance=1e-6):
+        """
+        PageRank over the similarity graph; rows without edges teleport uniformly.
+        """
+        n = len(sim)
+        totals = sim.sum(axis=1, keepdims=True)
+        transition = np.divide(sim, totals, out=np.zeros_like(sim), where=totals > 0)
+        dangling = totals[:, 0] == 0
+        scores = np.full(n, 1.0 / n)
+        for _ in range(iterations):
+            updated = (1 - self.damping) / n + self.damping * (scores @ transition + scores[dangling].sum() / n)
+            if np.abs(updated - scores).sum() < tolerance:
+                return updated
+            scores = updated
+        return scores
+
+    def summarize(self, text, max_length=SUMMARY_MAX_LENGTH):
+        """
+        Returns the summary of one resume.
+        """
+        candidates = [(span, section) for span, section in self.sentences(text) if self.is_prose(span)]
+        if not candidates:
+            return " ".join((text or "").split()[:max_length])
+        scores = self.rank(self.similarity([span for span, _ in candidates]))
+        scores *= np.array([SECTION_BOOSTS.get(section, 1.0) for _, section in candidates])
+        chosen = []
+        seen = set()
+        length = 0
+        for index in np.argsort(-scores, kind='stable'):
+            sentence = " ".join(candidates[index][0].text.split())
+            words = len(sentence.split())
+            if sentence.lower() in seen or (chosen and length + words > max_length):
+                continue
+            seen.add(sentence.lower())
+            chosen.append((index, sentence))
+            length += words
+            if length >= max_length:
+                break
+        return " ".join(sentence for _, sentence in sorted(chosen))
+
+def chunk_text(text, tokenizer=None, max_tokens=None):
+    """
+    Splits text into pieces that fit the summarization model's input limit,
+    so long resumes are summarized in full instead of being truncated.
+    """
+    if tokenizer is not None:
+        max_tokens = max_tokens or min(getattr(tokenizer, 'model_max_length', 1024), 1024)
+        # Leave room for the special tokens the pipeline adds around each input.
+        window = max(max_tokens - 8, 1)
+        ids = tokenizer.encode(text, add_special_tokens=False)
+        if len(ids) <= window:
+            return [text]
+        return [tokenizer.decode(ids[i:i + window], skip_special_tokens=True) for i in range(0, len(ids), window)]
+    words = text.split()
+    if len(words) <= CHUNK_WORDS:
+        return [text]
+    return [" ".join(words[i:i + CHUNK_WORDS]) for i in range(0, len(words), CHUNK_WORDS)]
+
+class SummaryWorker:
+    """
+    Background summarization worker.
+
+    Requests are queued, pending texts are gathered into a single batched pipeline
+    call, long resumes are chunked to the model's token limit, and every summary is
+    written to `summaries` (the persistent SUMMARY_DATA store) before its future resolves.
+    Concurrent requests for the same summary_id share one future.
+    """
+
+    def __init__(self, summaries, get_summarizer=get_summarizer, batch_size=SUMMARY_BATCH_SIZE, batch_wait=SUMMARY_BATCH_WAIT):
+        self.get_summarizer = get_summarizer
+        self.summaries = summaries
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue = queue.Queue()
+        self._pending = {}            # summary_id -> Future
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='summary-worker', daemon=True)
+                self._thread.start()
+
+    def submit(self, summary_id, text):
+        """
+        Queues a resume for summarization. Returns a Future resolving to the summary text.
+        """
+        existing = self.summaries.get(summary_id)
+        if existing is not None:
+            future = Future()
+            future.set_result(existing)
+            return future
+        with self._lock:
+            future = self._pending.get(summary_id)
+            if future is not None:
+                return future
+            future = Future()
+            self._pending[summary_id] = future
+        self._queue.put((summary_id, text))
+        self._ensure_started()
+        return future
+
+    def summarize(self, summary_id, text, timeout=SUMMARY_TIMEOUT):
+        """
+        Blocking helper for request handlers.
+        """
+        return self.submit(summary_id, text).result(timeout=timeout)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get(timeout=self.batch_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def _summarize_chunks(self, summarizer, chunks):
+        outputs = summarizer(chunks, max_length=SUMMARY_MAX_LENGTH, min_length=SUMMARY_MIN_LENGTH,
+                             do_sample=False, truncation=True, batch_size=self.batch_size)
+        return [output['summary_text'] for output in outputs]
+
+    def _process(self, batch):
+        summarizer = self.get_summarizer()
+        tokenizer = getattr(summarizer, 'tokenizer', None)
+        chunks = []
+        owners = []
+        for index, (_, text) in enumerate(batch):
+            for chunk in (chunk_text(text, tokenizer) if getattr(summarizer, 'chunked', True) else [text]):
+                chunks.append(chunk)
+                owners.append(index)
+        try:
+            outputs = self._summarize_chunks(summarizer, chunks)
+            errors = [None] * len(batch)
+        except Exception:
+            # Retry one resume at a time so a single bad input does not fail the batch.
+            outputs = [None] * len(chunks)
+            errors = [None] * len(batch)
+            for index in range(len(batch)):
+                positions = [i for i, owner in enumerate(owners) if owner == index]
+                try:
+                    for position, summary in zip(positions, self._summarize_chunks(summarizer, [chunks[i] for i in positions])):
+                        outputs[position] = summary
+                except Exception as e:
+                    errors[index] = e
+        parts = [[] for _ in batch]
+        for owner, summary in zip(owners, outputs):
+            if summary is not None:
+                parts[owner].append(summary)
+        for index, (summary_id, _) in enumerate(batch):
+            with self._lock:
+                future = self._pending.pop(summary_id, None)
+            if future is None:
+                continue
+            if errors[index] is not None:
+                future.set_exception(errors[index])
+                continue
+            summary_text = "\n".join(parts[index])
+            self.summaries[summary_id] = summary_text
+            future.set_result(summary_text)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._process(batch)
+            except Exception as e:
+                for summary_id, _ in batch:
+                    with self._lock:
+                        future = self._pending.pop(summary_id, None)
+                    if future is not None and not future.done():
+                        future.set_exception(e)
+
+    def presummarize(self, results, texts, top_n=PRESUMMARIZE_TOP_N):
+        """
+        Queues the top-N ranked results for background summarization.
+        """
+        if top_n <= 0:
+            return
+        for result in results[:top_n]:
+            summary_id = result.get('summary_id')
+            text = texts.get(summary_id) if summary_id else None
+            if text:
+                self.submit(summary_id, text)
@@ -0,0 +1,23 @@
+import random
+from bulk_scoring import BulkScorer
+from scoring import compute_score_robust
+from test_scoring import random_criteria, random_text
+
+def test_bulk_scores_match_compute_score_robust():
+    rng = random.Random(0)
+    for _ in range(50):
+        texts = [random_text(rng) for _ in range(20)]
+        profiles = [random_criteria(rng) for _ in range(rng.randint(1, 6))]
+        table = BulkScorer.from_criteria(profiles).score_texts(texts)
+        for j, criteria in enumerate(profiles):
+            for i, text in enumerate(texts):
+                expected = compute_score_robust(text, **criteria)
+                assert (round(float(table.scores[i, j]), 2), table.breakdown(i, j)) == expected, (text, criteria)
+
+def test_ranked_orders_by_score():
+    profiles = [{'job_title': 'python developer', 'required_skills': 'python, sql', 'required_languages': '',
+                 'min_skills': '', 'min_languages': '', 'enable_ats': 'no', 'enable_bonus': 'no',
+                 'extra_bonus_keywords': '', 'extra_universities': ''}]
+    table = BulkScorer.from_criteria(profiles).score_texts(["java", "python developer, sql", "python"])
+    assert [row for row, _, _ in table.ranked(0)] == [1, 2, 0]
+    assert [row for row, _, _ in table.ranked(0, top=1)] == [1]
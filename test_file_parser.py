@@ -0,0 +1,75 @@
+import io
+import zipfile
+import pytest
+from file_parser import extract_text_from_docx
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+MC = 'http://schemas.openxmlformats.org/markup-compatibility/2006'
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>')
+RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>')
+
+def part(body):
+    return f'<w:document xmlns:w="{W}" xmlns:mc="{MC}"><w:body>{body}</w:body></w:document>'
+
+def para(*runs):
+    return '<w:p>' + ''.join(f'<w:r><w:t xml:space="preserve">{run}</w:t></w:r>' for run in runs) + '</w:p>'
+
+def docx(body, headers=(), footers=()):
+    """
+    A minimal DOCX package (readable by python-docx too) with the given body XML.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('[Content_Types].xml', CONTENT_TYPES)
+        archive.writestr('_rels/.rels', RELS)
+        archive.writestr('word/document.xml', part(body))
+        for i, header in enumerate(headers, 1):
+            archive.writestr(f'word/header{i}.xml', f'<w:hdr xmlns:w="{W}">{header}</w:hdr>')
+        for i, footer in enumerate(footers, 1):
+            archive.writestr(f'word/footer{i}.xml', f'<w:ftr xmlns:w="{W}">{footer}</w:ftr>')
+    return buffer.getvalue()
+
+def test_tab_stops_are_not_text():
+    data = docx('<w:p><w:pPr><w:tabs><w:tab w:val="left" w:pos="720"/><w:tab w:val="right" w:pos="9000"/>'
+                '</w:tabs></w:pPr><w:r><w:t>Jane Doe</w:t></w:r></w:p>' + para('Python developer'))
+    assert extract_text_from_docx(data, mode='stream') == 'Jane Doe\nPython developer'
+    assert extract_text_from_docx(data, mode='python-docx') == 'Jane Doe\nPython developer'
+
+def test_tabs_and_breaks_inside_runs_are_kept():
+    data = docx('<w:p><w:r><w:t>2019</w:t><w:tab/><w:t>Acme</w:t><w:br/><w:t>Analyst</w:t></w:r></w:p>')
+    assert extract_text_from_docx(data, mode='stream') == '2019\tAcme\nAnalyst'
+
+def test_table_cells_come_out_in_order():
+    data = docx(para('Skills') + '<w:tbl><w:tr><w:tc>' + para('Python') + '</w:tc><w:tc>' + para('SQL')
+                + '</w:tc></w:tr></w:tbl>' + para('Education'))
+    assert extract_text_from_docx(data, mode='stream') == 'Skills\nPython\nSQL\nEducation'
+
+def test_text_box_is_read_once_without_its_fallback_copy():
+    text_box = ('<w:p><w:r><mc:AlternateContent><mc:Choice Requires="wps"><w:txbxContent>' + para('Jane Doe')
+                + '</w:txbxContent></mc:Choice><mc:Fallback><w:txbxContent>' + para('Jane Doe')
+                + '</w:txbxContent></mc:Fallback></mc:AlternateContent></w:r></w:p>')
+    assert extract_text_from_docx(docx(text_box + para('Summary')), mode='stream') == 'Jane Doe\n\nSummary'
+
+def test_headers_first_and_footers_last_once_each():
+    data = docx(para('Body'), headers=[para('Jane Doe'), para('Jane Doe')], footers=[para('Page 1')])
+    assert extract_text_from_docx(data, mode='stream') == 'Jane Doe\nBody\nPage 1'
+
+def test_runs_of_empty_paragraphs_collapse_to_one_blank_line():
+    data = docx('<w:p/><w:p/>' + para('Jane Doe') + '<w:p/><w:p/><w:p/>' + para('Experience'))
+    assert extract_text_from_docx(data, mode='stream') == 'Jane Doe\n\nExperience'
+
+@pytest.mark.parametrize("mode", ['stream', 'python-docx'])
+def test_corrupt_docx_reports_an_error(mode):
+    assert extract_text_from_docx(b'not a docx', mode=mode).startswith('Error extracting DOCX text:')
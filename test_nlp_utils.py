@@ -0,0 +1,78 @@
+import pytest
+import spacy
+import nlp_utils
+from nlp_utils import analyze_resume, cheap_tiers, needs_ner
+
+@pytest.fixture
+def nlp(monkeypatch):
+    """
+    A blank English pipeline whose entity ruler knows one person and one university,
+    standing in for the configured spaCy model.
+    """
+    pipeline = spacy.blank('en')
+    pipeline.add_pipe('entity_ruler').add_patterns([
+        {'label': 'PERSON', 'pattern': 'Jane Doe'},
+        {'label': 'ORG', 'pattern': 'Stanford University'},
+    ])
+    monkeypatch.setattr(nlp_utils, 'get_nlp', lambda: pipeline)
+    return pipeline
+
+@pytest.fixture
+def no_nlp(monkeypatch):
+    def fail():
+        raise AssertionError("spaCy should not run")
+    monkeypatch.setattr(nlp_utils, 'get_nlp', fail)
+
+@pytest.mark.parametrize("email", ['jane.doe@example.com', 'janedoe@example.com', 'jdoe@example.com', 'doe.j@example.com'])
+def test_header_tier_needs_the_email_to_agree(email):
+    assert cheap_tiers(f"Jane Doe\nData Analyst\n{email}")[1:] == ("Jane Doe", "header")
+
+@pytest.mark.parametrize("line", ["Customer Service", "New York", "Data Analyst", "Registered Nurse",
+                                  "Acme Corporation", "ATTORNEY AT LAW"])
+def test_header_tier_rejects_lines_that_only_look_like_names(line):
+    text = f"{line}\nhello@acme.com\n555 123 4567"
+    assert cheap_tiers(text)[1:] == (None, None)
+    assert needs_ner(text, policy='fallback')
+
+def test_header_tier_skips_non_name_lines_above_the_name():
+    assert cheap_tiers("Customer Service\nJane Doe\njane@example.com")[1:] == ("Jane Doe", "header")
+
+def test_header_line_without_agreeing_email_is_left_to_ner():
+    assert cheap_tiers("Jane Doe\nData Analyst")[1:] == (None, None)
+
+def test_contact_tier_joins_a_name_split_over_two_lines():
+    text = "Summary\nSkills\nProfile\nLISANDRO\nMILANESI\nChef\nlisandro@example.com"
+    assert cheap_tiers(text)[1:] == ("LISANDRO MILANESI", "contact")
+
+def test_fallback_policy_skips_spacy_when_a_cheap_tier_resolves(no_nlp):
+    text = "Jane Doe\njane@example.com\nEducation\nStanford University, 2015"
+    assert not needs_ner(text, policy='fallback')
+    analysis = analyze_resume(text, policy='fallback')
+    assert (analysis['candidate_name'], analysis['name_tier']) == ("Jane Doe", "header")
+    assert analysis['entities'] == {"PERSON": [], "ORG": [], "DATE": []}
+    # Without a Doc, institutions are matched line segment by line segment.
+    assert analysis['validation']['valid_institutions'] == ["Stanford University"]
+
+def test_fallback_policy_uses_ner_when_cheap_tiers_fail(nlp):
+    text = "Customer Service\nNew York\nAbout: Jane Doe\nhello@acme.com"
+    analysis = analyze_resume(text, policy='fallback')
+    assert (analysis['candidate_name'], analysis['name_tier']) == ("Jane Doe", "ner")
+    assert analysis['entities']['PERSON'] == ["Jane Doe"]
+
+def test_heuristic_tier_when_ner_finds_no_person(nlp):
+    analysis = analyze_resume("Customer Service\nhello@acme.com", policy='fallback')
+    assert analysis['name_tier'] == "heuristic"
+
+def test_always_policy_parses_every_resume(nlp):
+    text = "Jane Doe\njane@example.com\nEducation\nStanford University, 2015"
+    assert needs_ner(text, policy='always')
+    analysis = analyze_resume(text, policy='always')
+    assert (analysis['candidate_name'], analysis['name_tier']) == ("Jane Doe", "header")
+    assert analysis['entities']['PERSON'] == ["Jane Doe"]
+    assert analysis['validation']['valid_institutions'] == ["Stanford University"]
+
+def test_cheap_tiers_passed_in_are_not_recomputed(no_nlp, monkeypatch):
+    text = "Jane Doe\njane@example.com"
+    cheap = cheap_tiers(text)
+    monkeypatch.setattr(nlp_utils, 'extract_contacts', lambda text: pytest.fail("contacts scanned twice"))
+    assert analyze_resume(text, policy='fallback', cheap=cheap)['candidate_name'] == "Jane Doe"
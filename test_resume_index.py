@@ -0,0 +1,46 @@
+import random
+import pytest
+from resume_index import InvertedIndex
+from scoring import get_scorer
+
+BONUS_KEYWORDS = "c++, .net, node.js, r&d, c#, a.i."
+
+def index_of(texts):
+    index = InvertedIndex()
+    for doc_id, text in enumerate(texts):
+        index.add(doc_id, text)
+    return index
+
+@pytest.mark.parametrize("text", [
+    "I know c++ and .net and node.js, r&d.",
+    "asp.net c++11 node . js r & d",
+    "C#dev x.net.y c++x",
+    "r&d team; (c++) 5c#6",
+    "a.i. a.i.x sql",
+])
+def test_bonus_keywords_with_punctuation_match_like_word_matcher(text):
+    scorer = get_scorer('developer', 'sql, .net, c++, node.js', '', '', '', 'yes', 'yes', BONUS_KEYWORDS, '')
+    found = index_of([text]).match(scorer, [0])[0]
+    assert found == scorer.match(text)
+
+def test_index_matches_raw_text_on_random_texts():
+    rng = random.Random(0)
+    pieces = ['c', '+', '.', 'net', 'node', 'js', 'r', '&', 'd', '#', 'a', 'i', 'x', ' ', ' ', '  ', '\n', '\t',
+              'sql', 'asp', 'project', 'management']
+    texts = ["".join(rng.choice(pieces) for _ in range(rng.randint(5, 40))) for _ in range(2000)]
+    scorer = get_scorer('project manager', 'sql, .net, c++, node.js, node js, project management', '', '', '',
+                        'yes', 'yes', BONUS_KEYWORDS + ", node js, project management", '')
+    found = index_of(texts).match(scorer, range(len(texts)))
+    assert all(found[i] == scorer.match(text) for i, text in enumerate(texts))
+
+@pytest.mark.parametrize("text", ["project\nmanagement", "project  management", "project\tmanagement",
+                                  "project management", "xproject managementx"])
+def test_multi_word_keywords_need_the_keywords_spacing(text):
+    scorer = get_scorer('', 'project management', '', '', '', 'no', 'yes', 'project management', '')
+    assert index_of([text]).match(scorer, [0])[0] == scorer.match(text)
+
+def test_remove_forgets_document():
+    index = index_of(["python developer", "java developer"])
+    index.remove(0)
+    assert 0 not in index
+    assert index.docs_matching("developer") == {1}
@@ -0,0 +1,120 @@
+import re
+import random
+import pytest
+from scoring import compute_score_robust
+
+WORDS = ("python java sql aws certified cisco scrum pmp google microsoft project manager management budget "
+         "english spanish experience education skills summary profile objective c++ .net lead legal "
+         "attorney stanford university").split()
+
+def reference_score(resume_text, job_title, required_skills, required_languages,
+                    min_skills, min_languages, enable_ats, enable_bonus,
+                    extra_bonus_keywords, extra_universities):
+    """
+    The original per-keyword implementation of compute_score_robust.
+    """
+    base_text = str(resume_text).lower() if resume_text else ""
+
+    required_skills_list = [s.strip().lower() for s in required_skills.split(',') if s.strip()]
+    skills_score = 0
+    if required_skills_list:
+        matched_skills = sum(1 for s in required_skills_list if s in base_text)
+        if min_skills and str(min_skills).isdigit() and int(min_skills) > 0:
+            min_skills_val = int(min_skills)
+            skills_score = 4 if matched_skills >= min_skills_val else (matched_skills / min_skills_val) * 4
+        else:
+            skills_score = (matched_skills / len(required_skills_list)) * 4
+        skills_score = min(skills_score, 4)
+
+    job_title_score = 0
+    if job_title:
+        job_title_lower = job_title.lower().strip()
+        if job_title_lower in base_text:
+            job_title_score = 1
+        else:
+            words = job_title_lower.split()
+            if words:
+                match = sum(1 for word in words if word in base_text)
+                job_title_score = min(match / len(words), 1)
+    component1_score = skills_score + job_title_score
+
+    language_score = 1
+    if required_languages:
+        languages_list = [s.strip().lower() for s in required_languages.split(',') if s.strip()]
+        if languages_list:
+            matched_languages = sum(1 for lang in languages_list if lang in base_text)
+            if min_languages and str(min_languages).isdigit() and int(min_languages) > 0:
+                min_languages_val = int(min_languages)
+                language_score = 1 if matched_languages >= min_languages_val else (matched_languages / min_languages_val)
+            else:
+                language_score = matched_languages / len(languages_list)
+
+    if str(enable_bonus).strip().lower() == "yes":
+        bonus_score = 0.0
+        bonus_keywords = {'aws certified': 1.0, 'cisco certified': 1.0, 'pmp': 1.0, 'google': 0.5,
+                          'microsoft': 0.5, 'oracle': 0.5, 'ibm': 0.5, 'certified': 0.3, 'scrum': 0.3}
+        for kw in (extra_bonus_keywords or '').split(','):
+            if kw.strip():
+                bonus_keywords[kw.strip().lower()] = 0.5
+        for uni in (extra_universities or '').split(','):
+            if uni.strip():
+                bonus_keywords[uni.strip().lower()] = 0.5
+        for keyword, points in bonus_keywords.items():
+            if re.search(r'\b' + re.escape(keyword) + r'\b', base_text):
+                bonus_score += points
+        bonus_score = min(bonus_score, 2)
+    else:
+        bonus_score = 2
+
+    if str(enable_ats).strip().lower() == "yes":
+        ats_keywords = ["experience", "education", "skills", "certification", "projects", "summary", "objective", "profile"]
+        ats_count = sum(1 for word in ats_keywords if word in base_text)
+        ats_score = min((ats_count / len(ats_keywords)) * 2, 2)
+    else:
+        ats_score = 2
+
+    raw_total = component1_score + language_score + bonus_score + ats_score
+    breakdown = {
+        "required_skills": round(skills_score, 2),
+        "job_title": round(job_title_score, 2),
+        "skills_job": round(component1_score, 2),
+        "languages": round(language_score, 2),
+        "bonus": round(bonus_score, 2),
+        "ats": round(ats_score, 2),
+        "raw_total": round(raw_total, 2),
+        "total_max": 10,
+    }
+    return round(raw_total, 2), breakdown
+
+def random_text(rng):
+    return " ".join(rng.choice(WORDS + ["x", "the", ",", ".", "\n", "asp.net", "c++11"])
+                    for _ in range(rng.randint(0, 80)))
+
+def random_criteria(rng):
+    pick = lambda n: ", ".join(rng.sample(WORDS, rng.randint(0, n)))
+    return {
+        'job_title': rng.choice(['', ' ', 'project manager', 'Legal Attorney ', 'python lead lead']),
+        'required_skills': pick(5) + rng.choice(['', ', python', ', ']),
+        'required_languages': rng.choice(['', ' ', 'english', 'english, spanish', ',']),
+        'min_skills': rng.choice(['', '0', '2', '3', 'x']),
+        'min_languages': rng.choice(['', '1', '2']),
+        'enable_ats': rng.choice(['yes', 'no', ' YES ']),
+        'enable_bonus': rng.choice(['yes', 'no']),
+        'extra_bonus_keywords': pick(3),
+        'extra_universities': rng.choice(['', 'stanford', 'stanford university']),
+    }
+
+def test_scorer_matches_reference_on_random_inputs():
+    rng = random.Random(0)
+    for _ in range(300):
+        criteria = random_criteria(rng)
+        for _ in range(10):
+            text = random_text(rng)
+            assert compute_score_robust(text, **criteria) == reference_score(text, **criteria), (text, criteria)
+
+@pytest.mark.parametrize("job_title", [' ', '\t', '  \n'])
+def test_whitespace_only_job_title_scores_full_point(job_title):
+    criteria = dict(random_criteria(random.Random(1)), job_title=job_title)
+    score, breakdown = compute_score_robust("python developer", **criteria)
+    assert breakdown["job_title"] == 1
+    assert (score, breakdown) == reference_score("python developer", **criteria)
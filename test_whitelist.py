@@ -0,0 +1,15 @@
+import random
+from nlp_utils import check_against_whitelist, WHITELIST_INSTITUTIONS
+from whitelist import WhitelistIndex
+
+VOCAB = ("stanford university harvard massachusetts institute of technology mit college "
+         "state the school law acme corp google inc").split()
+
+def test_index_matches_fuzzy_loop_on_random_names():
+    rng = random.Random(0)
+    names = [" ".join(rng.choice(VOCAB) for _ in range(rng.randint(1, 5))) for _ in range(1000)]
+    names += ["Stanford  University", "STANFORD UNIVERSITY", ""]
+    whitelist = WHITELIST_INSTITUTIONS + [f"University of Place {i}" for i in range(500)]
+    index = WhitelistIndex(whitelist)
+    assert [name for name in names if name in index] == [name for name in names if check_against_whitelist(name, whitelist)]
+    assert WhitelistIndex(whitelist).filter(names) == [name for name in names if check_against_whitelist(name, whitelist)]
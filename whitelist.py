@@ -0,0 +1,114 @@
+import os
+import threading
+from collections import OrderedDict
+from rapidfuzz import fuzz, process
+
+# Fuzzy whitelist matching.
+WHITELIST_CACHE_SIZE = int(os.environ.get('RESUME_WHITELIST_CACHE_SIZE', 4096))
+# A match needs a token_set_ratio strictly above this score.
+WHITELIST_THRESHOLD = 80
+
+def normalize(value):
+    """
+    Lowercases and collapses whitespace. token_set_ratio splits on whitespace, so
+    this changes no scores, it only lets equivalent spellings share a cache entry.
+    """
+    return " ".join(str(value).lower().split())
+
+def read_whitelist_file(path):
+    """
+    Reads one entry per line, skipping blank lines and # comments.
+    """
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+
+class WhitelistIndex:
+    """
+    Fuzzy whitelist (institutions, certifications) preprocessed once.
+
+    Entries are normalized up front and queried with rapidfuzz's extractOne/cdist
+    and a score cutoff, so lookups run in C instead of a Python loop over the list.
+    Results are memoized per normalized string in a bounded LRU cache, since the
+    same organizations recur across resumes.
+    """
+
+    def __init__(self, entries, threshold=WHITELIST_THRESHOLD, cache_size=WHITELIST_CACHE_SIZE):
+        self.entries = list(dict.fromkeys(e for e in entries if e and e.strip()))
+        self.threshold = threshold
+        self.cache_size = cache_size
+        self._choices = [normalize(e) for e in self.entries]
+        self._cache = OrderedDict()   # normalized string -> matched entry or None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, entries=(), path=None, **kwargs):
+        """
+        Builds an index from built-in entries plus, optionally, a whitelist file.
+        """
+        entries = list(entries)
+        if path:
+            entries += read_whitelist_file(path)
+        return cls(entries, **kwargs)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _cached(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return True, self._cache[key]
+        return False, None
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def best_match(self, value):
+        """
+        Returns the whitelist entry matching `value`, or None.
+        """
+        key = normalize(value)
+        hit, entry = self._cached(key)
+        if hit:
+            return entry
+        entry = None
+        if self._choices:
+            # score_cutoff keeps scores >= threshold; the rule is strictly greater.
+            found = process.extractOne(key, self._choices, scorer=fuzz.token_set_ratio,
+                                       processor=None, score_cutoff=self.threshold)
+            if found is not None and found[1] > self.threshold:
+                entry = self.entries[found[2]]
+        self._remember(key, entry)
+        return entry
+
+    def __contains__(self, value):
+        return self.best_match(value) is not None
+
+    def filter(self, values):
+        """
+        Returns the values that match the whitelist, in order. Values not cached yet
+        are scored together in one cdist call.
+        """
+        keys = [normalize(v) for v in values]
+        results = {}
+        missing = []
+        for key in keys:
+            hit, entry = self._cached(key)
+            if hit:
+                results[key] = entry
+            elif key not in results:
+                results[key] = None
+                missing.append(key)
+        if missing and self._choices:
+            scores = process.cdist(missing, self._choices, scorer=fuzz.token_set_ratio,
+                                   processor=None, score_cutoff=self.threshold, workers=-1)
+            for key, row in zip(missing, scores):
+                best = int(row.argmax())
+                results[key] = self.entries[best] if row[best] > self.threshold else None
+        for key in missing:
+            self._remember(key, results[key])
+        return [value for value, key in zip(values, keys) if results[key] is not None]